@@ -2,7 +2,8 @@
 
 import os
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 
@@ -27,24 +28,71 @@ def get_database_url():
     return f"sqlite:///{Path(__file__).parent.parent}/data/finance.db"
 
 
-def create_db_engine(db_url: str):
-    """Create SQLAlchemy engine based on database type."""
+# Applied to every file-backed SQLite connection. WAL with synchronous=NORMAL
+# drops the fsync per commit that the default rollback journal pays.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=10737418240",
+)
+
+
+def _set_sqlite_pragmas(dbapi_conn, connection_record):
+    """Tune a fresh SQLite connection for write-heavy use."""
+    cursor = dbapi_conn.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def create_db_engine(db_url: str, pool_size: int = 5, max_overflow: int = 10):
+    """Create SQLAlchemy engine based on database type.
+    
+    pool_size and max_overflow only apply to PostgreSQL; long single-writer
+    jobs can pass a smaller pool than the app default.
+    """
     if db_url.startswith("sqlite"):
         # Ensure data directory exists for SQLite
         db_path = db_url.replace("sqlite:///", "")
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
-        return create_engine(
+        sqlite_engine = create_engine(
             db_url,
             connect_args={"check_same_thread": False},
+            insertmanyvalues_page_size=1000,
         )
+        if make_url(db_url).database not in (None, "", ":memory:"):
+            event.listen(sqlite_engine, "connect", _set_sqlite_pragmas)
+        return sqlite_engine
     else:
         # PostgreSQL
+        driver = make_url(db_url).get_driver_name()
+        driver_options = {}
+        if driver == "psycopg2":
+            # INSERT executemany already pages through insertmanyvalues; this
+            # routes UPDATE/DELETE executemany through psycopg2's execute_batch.
+            driver_options = dict(
+                executemany_mode="values_plus_batch",
+                executemany_batch_page_size=500,
+            )
+        connect_args = {}
+        if driver in ("psycopg2", "psycopg"):
+            # libpq TCP keepalives; other drivers (pg8000, asyncpg) reject these
+            connect_args = {"keepalives": 1, "keepalives_idle": 60}
         return create_engine(
             db_url,
             pool_pre_ping=True,
-            pool_size=5,
-            max_overflow=10,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            # Reuse the most recently returned connection so idle extras can
+            # time out, and recycle before server/NAT idle limits kick in
+            pool_use_lifo=True,
+            pool_recycle=1800,
+            connect_args=connect_args,
+            insertmanyvalues_page_size=1000,
+            **driver_options,
         )
 
 
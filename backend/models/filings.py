@@ -1,7 +1,7 @@
 """SEC filing models."""
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Numeric, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from backend.database import Base
@@ -57,6 +57,11 @@ class FinancialFact(Base):
     filing_url = Column(String(1000))  # Direct link to source filing
     frame = Column(String(20))  # XBRL frame identifier (e.g., CY2023Q1)
     
+    __table_args__ = (
+        # Serves the latest-N-by-period lookups for a company's concept
+        Index("idx_financial_facts_company_concept_period", company_id, concept, period_end.desc()),
+    )
+    
     # Relationships
     filing = relationship("SecFiling", back_populates="facts")
     
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import Column, Integer, String, Date, DateTime, BigInteger, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, BigInteger, Numeric, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from backend.database import Base
@@ -25,6 +25,10 @@ class StockPrice(Base):
     volume = Column(BigInteger)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        Index("idx_stock_prices_ticker_date", ticker, date.desc()),
+    )
+    
     # Relationships
     company = relationship("Company", back_populates="prices")
     
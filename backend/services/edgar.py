@@ -2,6 +2,7 @@
 
 import time
 import logging
+import threading
 from datetime import date
 from typing import Optional
 
@@ -21,11 +22,35 @@ SEC_SUBMISSIONS = "https://data.sec.gov/submissions/CIK{cik}.json"
 SEC_COMPANY_FACTS = "https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json"
 
 
+class RateLimiter:
+    """Thread-safe limiter that spaces calls at least `interval` seconds apart."""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.next_time = time.monotonic()
+    
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+# Shared by every EdgarService in the process, so parallel callers together
+# stay under SEC's fair-access limit rather than each thread getting its own
+SEC_RATE_LIMITER = RateLimiter(settings.sec_rate_limit)
+
+
 class EdgarService:
     """Service for fetching SEC EDGAR filings and financial data."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, session: Optional[requests.Session] = None):
         self.db = db
+        # Batch callers can share one pooled keep-alive session across services
+        self.session = session or requests.Session()
         self.headers = {
             "User-Agent": settings.sec_user_agent,
             "Accept-Encoding": "gzip, deflate",
@@ -33,8 +58,8 @@ class EdgarService:
     
     def _request(self, url: str) -> dict:
         """Make rate-limited request to SEC API."""
-        time.sleep(settings.sec_rate_limit)
-        response = requests.get(url, headers=self.headers)
+        SEC_RATE_LIMITER.wait()
+        response = self.session.get(url, headers=self.headers)
         response.raise_for_status()
         return response.json()
     
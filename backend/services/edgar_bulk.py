@@ -7,15 +7,16 @@ Uses the Company Facts API for structured XBRL data (available from ~2009+).
 Rate limit: 10 requests/second per SEC guidelines.
 """
 
+import os
 import time
 import logging
-import json
 from datetime import datetime, date
 from typing import Optional
 from pathlib import Path
 from dataclasses import dataclass
 from decimal import Decimal
 
+import orjson
 import requests
 import yfinance as yf
 from sqlalchemy.orm import Session
@@ -81,6 +82,16 @@ FINANCIAL_CONCEPTS = [
     "PaymentsForRepurchaseOfCommonStock",
 ]
 
+# Facts per executemany call; the engine still pages each call into
+# insertmanyvalues_page_size-row statements
+DEFAULT_BATCH_SIZE = 10000
+
+# Facts are keyed on (cik, concept, period_end, fiscal_period); re-runs skip rows
+# that are already stored.
+FACT_UPSERT = insert(FinancialFact.__table__).on_conflict_do_nothing(
+    index_elements=["cik", "concept", "period_end", "fiscal_period"]
+)
+
 
 @dataclass
 class CompanyInfo:
@@ -186,8 +197,7 @@ class EdgarBulkService:
             logger.warning(f"Pre-generated company list not found: {companies_file}")
             return []
         
-        with open(companies_file) as f:
-            data = json.load(f)
+        data = orjson.loads(companies_file.read_bytes())
         
         companies = []
         for c in data.get("companies", []):
@@ -244,7 +254,13 @@ class EdgarBulkService:
         url = SEC_COMPANY_FACTS.format(cik=cik)
         return self._rate_limited_request(url)
     
-    def process_company(self, db: Session, company: CompanyInfo, min_year: int = 1990) -> dict:
+    def process_company(
+        self,
+        db: Session,
+        company: CompanyInfo,
+        min_year: int = 1990,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> dict:
         """Process a single company - fetch and store all financials."""
         logger.info(f"Processing {company.ticker} (CIK: {company.cik})...")
         
@@ -267,6 +283,7 @@ class EdgarBulkService:
         
         # Process facts
         facts_added = 0
+        records = []
         facts_by_taxonomy = facts_data.get("facts", {})
         
         for taxonomy, concepts in facts_by_taxonomy.items():
@@ -278,7 +295,6 @@ class EdgarBulkService:
                 units = concept_data.get("units", {})
                 
                 for unit_type, values in units.items():
-                    records = []
                     for val in values:
                         # Skip if no value or too old
                         if val.get("val") is None:
@@ -308,15 +324,17 @@ class EdgarBulkService:
                             "fiscal_period": val.get("fp"),
                             "instant": "start" not in val,
                         })
-                    
-                    if records:
-                        # Upsert records
-                        stmt = insert(FinancialFact.__table__).values(records)
-                        stmt = stmt.on_conflict_do_nothing(
-                            index_elements=["cik", "concept", "period_end", "fiscal_period"]
-                        )
-                        db.execute(stmt)
-                        facts_added += len(records)
+                        
+                        if len(records) == batch_size:
+                            # Upsert as an executemany so the compiled statement
+                            # is cached and batched by the driver
+                            db.execute(FACT_UPSERT, records)
+                            facts_added += len(records)
+                            records = []
+        
+        if records:
+            db.execute(FACT_UPSERT, records)
+            facts_added += len(records)
         
         db.commit()
         logger.info(f"  Added {facts_added} facts for {company.ticker}")
@@ -324,15 +342,19 @@ class EdgarBulkService:
         return {"ticker": company.ticker, "status": "ok", "facts": facts_added}
     
     def save_progress(self, progress: dict):
-        """Save ingestion progress to file."""
-        with open(self.progress_file, "w") as f:
-            json.dump(progress, f, indent=2, default=str)
+        """Save ingestion progress to file.
+        
+        Written to a temp file and swapped in with os.replace, so an interrupted
+        run never leaves a truncated progress file behind.
+        """
+        tmp_file = self.progress_file.with_suffix(".json.tmp")
+        tmp_file.write_bytes(orjson.dumps(progress, default=str, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_file, self.progress_file)
     
     def load_progress(self) -> dict:
         """Load ingestion progress from file."""
         if self.progress_file.exists():
-            with open(self.progress_file) as f:
-                return json.load(f)
+            return orjson.loads(self.progress_file.read_bytes())
         return {"completed": [], "failed": [], "last_index": 0}
     
     def run_bulk_ingestion(
@@ -340,6 +362,7 @@ class EdgarBulkService:
         limit: int = 2500,
         min_year: int = 1990,
         resume: bool = True,
+        batch_size: int = DEFAULT_BATCH_SIZE,
     ) -> dict:
         """
         Run bulk ingestion for top N companies.
@@ -348,6 +371,7 @@ class EdgarBulkService:
             limit: Number of companies to process
             min_year: Earliest year to fetch data for
             resume: Whether to resume from previous progress
+            batch_size: Facts per insert batch
         """
         logger.info(f"Starting bulk ingestion for top {limit} companies...")
         
@@ -367,7 +391,6 @@ class EdgarBulkService:
         self.save_progress(progress)
         
         # Process each company
-        db = SessionLocal()
         start_index = progress.get("last_index", 0)
         
         try:
@@ -375,24 +398,27 @@ class EdgarBulkService:
                 if company.ticker in progress["completed"]:
                     continue
                 
-                try:
-                    result = self.process_company(db, company, min_year)
-                    
-                    if result["status"] == "ok":
-                        progress["completed"].append(company.ticker)
-                    else:
+                # Fresh session per company; closing it drops the identity map
+                # so memory stays flat over thousands of companies
+                with SessionLocal() as db:
+                    try:
+                        result = self.process_company(db, company, min_year, batch_size)
+                        
+                        if result["status"] == "ok":
+                            progress["completed"].append(company.ticker)
+                        else:
+                            progress["failed"].append({
+                                "ticker": company.ticker,
+                                "reason": result["status"],
+                            })
+                        
+                    except Exception as e:
+                        logger.error(f"Error processing {company.ticker}: {e}")
+                        db.rollback()
                         progress["failed"].append({
                             "ticker": company.ticker,
-                            "reason": result["status"],
+                            "reason": str(e),
                         })
-                    
-                except Exception as e:
-                    logger.error(f"Error processing {company.ticker}: {e}")
-                    db.rollback()  # Rollback on error so session stays usable
-                    progress["failed"].append({
-                        "ticker": company.ticker,
-                        "reason": str(e),
-                    })
                 
                 progress["last_index"] = i + 1
                 progress["last_updated"] = datetime.now().isoformat()
@@ -403,7 +429,6 @@ class EdgarBulkService:
                     logger.info(f"Progress: {i+1}/{len(companies)} companies processed")
         
         finally:
-            db.close()
             self.save_progress(progress)
         
         logger.info(f"Bulk ingestion complete: {len(progress['completed'])} succeeded, {len(progress['failed'])} failed")
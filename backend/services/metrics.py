@@ -41,7 +41,8 @@ class MetricsService:
         
         fact = query.order_by(FinancialFact.period_end.desc()).first()
         
-        return Decimal(str(fact.value)) if fact and fact.value else None
+        # Numeric columns already load as Decimal
+        return fact.value if fact and fact.value else None
     
     def get_ttm_value(
         self,
@@ -72,7 +73,7 @@ class MetricsService:
             annual = self.get_latest_fact(company_id, concept, as_of)
             return annual
         
-        return sum(Decimal(str(f.value)) for f in facts if f.value)
+        return sum(f.value for f in facts if f.value)
     
     def calculate_metrics(self, ticker: str, as_of: Optional[date] = None) -> dict:
         """Calculate valuation metrics for a company."""
@@ -95,7 +96,7 @@ class MetricsService:
             return {"error": f"No price data for {ticker}"}
         
         # Use adj_close for split-adjusted price (falls back to close if not available)
-        price = Decimal(str(price_record.adj_close or price_record.close))
+        price = price_record.adj_close or price_record.close
         
         # Get shares outstanding
         shares = self.edgar.get_shares_outstanding(ticker)
@@ -19,12 +19,15 @@ Key insight: Weighted averages are computed by summing the components, not avera
 """
 
 import logging
+from collections import defaultdict
 from datetime import date, timedelta
 from decimal import Decimal
 from typing import Optional
 from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
@@ -80,6 +83,13 @@ class AggregateMetrics:
     company_count: int
 
 
+# DailyMetrics fields summed across a bundle (order matters for unpacking)
+COMPONENT_FIELDS = ["market_cap", "enterprise_value", "net_income_ttm", "revenue_ttm", "ebitda_ttm"]
+
+
+# Flow concepts summed over the trailing four quarters
+TTM_CONCEPTS = ["Revenues", "NetIncomeLoss", "EBITDA", "OperatingIncomeLoss", "DepreciationAndAmortization"]
+
 # Sector definitions based on SIC codes (first 2 digits)
 SECTOR_DEFINITIONS = {
     "Technology": ["35", "36", "37", "73"],  # Computers, Electronics, Software
@@ -105,6 +115,26 @@ PREMADE_BUNDLES = {
     "Streaming": ["NFLX", "DIS", "WBD", "PARA", "CMCSA"],
 }
 
+# Reverse index: 2-digit SIC prefix -> sectors (a prefix can belong to several)
+_PREFIX_TO_SECTORS: dict[str, list[str]] = defaultdict(list)
+for _sector, _prefixes in SECTOR_DEFINITIONS.items():
+    for _prefix in _prefixes:
+        _PREFIX_TO_SECTORS[_prefix].append(_sector)
+
+
+def get_sectors_for_sic(sic_code: Optional[str]) -> list[str]:
+    """Get the sectors a SIC code belongs to."""
+    if not sic_code:
+        return []
+    return _PREFIX_TO_SECTORS.get(sic_code[:2], [])
+
+
+def _records_to_frame(records: list[dict]) -> pd.DataFrame:
+    """Build an Arrow-backed DataFrame (date32 dates, nullable doubles) from row dicts."""
+    if not records:
+        return pd.DataFrame()
+    return pa.Table.from_pylist(records).to_pandas(types_mapper=pd.ArrowDtype)
+
 
 class TimeSeriesService:
     """Service for time series valuation metrics."""
@@ -112,6 +142,23 @@ class TimeSeriesService:
     def __init__(self, db: Session):
         self.db = db
         self._financial_cache = {}  # Cache TTM financials by (ticker, as_of_date)
+        self._company_by_ticker: dict[str, Optional[Company]] = {}
+    
+    def _load_companies(self, tickers: list[str]) -> None:
+        """Load any uncached companies for these tickers in a single query."""
+        missing = [t for t in tickers if t not in self._company_by_ticker]
+        if not missing:
+            return
+        
+        companies = self.db.query(Company).filter(Company.ticker.in_(missing)).all()
+        found = {c.ticker: c for c in companies}
+        for ticker in missing:
+            self._company_by_ticker[ticker] = found.get(ticker)
+    
+    def _get_company(self, ticker: str) -> Optional[Company]:
+        """Get a company by ticker, using the per-service cache."""
+        self._load_companies([ticker])
+        return self._company_by_ticker[ticker]
     
     def get_financial_as_of(
         self,
@@ -127,26 +174,9 @@ class TimeSeriesService:
         For point-in-time (balance sheet items), gets the latest value.
         """
         if ttm:
-            # Get last 4 quarterly values
-            facts = (
-                self.db.query(FinancialFact)
-                .filter(
-                    FinancialFact.company_id == company_id,
-                    FinancialFact.concept == concept,
-                    FinancialFact.fiscal_period.in_(["Q1", "Q2", "Q3", "Q4"]),
-                    FinancialFact.period_end <= as_of,
-                )
-                .order_by(FinancialFact.period_end.desc())
-                .limit(4)
-                .all()
-            )
-            
-            if len(facts) >= 4:
-                return sum(float(f.value) for f in facts if f.value)
-            elif facts:
-                # Annualize if we have fewer quarters
-                avg = sum(float(f.value) for f in facts if f.value) / len(facts)
-                return avg * 4
+            value = self.get_ttm_financials([company_id], [concept], as_of).get((company_id, concept))
+            if value is not None:
+                return value
         
         # Point-in-time value
         fact = (
@@ -162,6 +192,58 @@ class TimeSeriesService:
         
         return float(fact.value) if fact and fact.value else None
     
+    def get_ttm_financials(
+        self,
+        company_ids: list[int],
+        concepts: list[str],
+        as_of: date,
+    ) -> dict[tuple[int, str], float]:
+        """
+        Get TTM values for many companies and concepts in one query.
+        
+        Ranks quarterly facts per (company, concept) by period_end with a
+        window function and sums the latest 4 in the database. Pairs with
+        fewer than 4 quarters are annualized; pairs with none are omitted.
+        """
+        ranked = (
+            self.db.query(
+                FinancialFact.company_id,
+                FinancialFact.concept,
+                FinancialFact.value,
+                func.row_number().over(
+                    partition_by=(FinancialFact.company_id, FinancialFact.concept),
+                    order_by=FinancialFact.period_end.desc(),
+                ).label("rn"),
+            )
+            .filter(
+                FinancialFact.company_id.in_(company_ids),
+                FinancialFact.concept.in_(concepts),
+                FinancialFact.fiscal_period.in_(["Q1", "Q2", "Q3", "Q4"]),
+                FinancialFact.period_end <= as_of,
+            )
+            .subquery()
+        )
+        
+        rows = (
+            self.db.query(
+                ranked.c.company_id,
+                ranked.c.concept,
+                func.sum(ranked.c.value),
+                func.count(),
+            )
+            .filter(ranked.c.rn <= 4)
+            .group_by(ranked.c.company_id, ranked.c.concept)
+            .all()
+        )
+        
+        results = {}
+        for company_id, concept, total, count in rows:
+            total = float(total) if total else 0.0
+            # Annualize if we have fewer quarters
+            results[(company_id, concept)] = total if count >= 4 else total / count * 4
+        
+        return results
+    
     def get_shares_outstanding(self, company_id: int, as_of: date) -> Optional[float]:
         """Get shares outstanding as of a date."""
         return self.get_financial_as_of(
@@ -178,7 +260,7 @@ class TimeSeriesService:
         end_date: date,
     ) -> list[DailyMetrics]:
         """Calculate daily valuation metrics for a single company."""
-        company = self.db.query(Company).filter(Company.ticker == ticker).first()
+        company = self._get_company(ticker)
         if not company:
             return []
         
@@ -200,14 +282,25 @@ class TimeSeriesService:
         # Get financial data (use latest available for the whole period)
         # In production, you'd want to update these as new filings come in
         shares = self.get_shares_outstanding(company.id, end_date)
-        revenue_ttm = self.get_financial_as_of(company.id, "Revenues", end_date, ttm=True)
-        net_income_ttm = self.get_financial_as_of(company.id, "NetIncomeLoss", end_date, ttm=True)
-        ebitda_ttm = self.get_financial_as_of(company.id, "EBITDA", end_date, ttm=True)
+        
+        # Fetch every TTM concept in one query; fall back to the latest
+        # point-in-time value when a concept has no quarterly facts
+        ttm_values = self.get_ttm_financials([company.id], TTM_CONCEPTS, end_date)
+        
+        def ttm_value(concept: str) -> Optional[float]:
+            value = ttm_values.get((company.id, concept))
+            if value is None:
+                value = self.get_financial_as_of(company.id, concept, end_date, ttm=False)
+            return value
+        
+        revenue_ttm = ttm_value("Revenues")
+        net_income_ttm = ttm_value("NetIncomeLoss")
+        ebitda_ttm = ttm_value("EBITDA")
         
         # If no EBITDA, try to estimate from operating income + D&A
         if not ebitda_ttm:
-            op_income = self.get_financial_as_of(company.id, "OperatingIncomeLoss", end_date, ttm=True)
-            depreciation = self.get_financial_as_of(company.id, "DepreciationAndAmortization", end_date, ttm=True)
+            op_income = ttm_value("OperatingIncomeLoss")
+            depreciation = ttm_value("DepreciationAndAmortization")
             if op_income and depreciation:
                 ebitda_ttm = op_income + depreciation
             elif op_income:
@@ -262,40 +355,46 @@ class TimeSeriesService:
         
         return results
     
-    def calculate_bundle_metrics(
+    def _component_frames(
         self,
         tickers: list[str],
-        bundle_name: str,
         start_date: date,
         end_date: date,
-    ) -> list[AggregateMetrics]:
-        """
-        Calculate aggregate metrics for a bundle of companies.
+    ) -> dict[str, pd.DataFrame]:
+        """Per-ticker component frames indexed by date (tickers without data are omitted)."""
+        self._load_companies(tickers)
         
-        Uses proper weighting:
-        - Aggregate P/E = Total Market Cap / Total Net Income
-        - Aggregate EV/Revenue = Total EV / Total Revenue
-        """
-        # Get daily metrics for all companies
-        all_metrics: dict[date, list[DailyMetrics]] = {}
-        
-        for ticker in tickers:
+        frames = {}
+        for ticker in dict.fromkeys(tickers):
             daily = self.calculate_daily_metrics(ticker, start_date, end_date)
-            for m in daily:
-                if m.date not in all_metrics:
-                    all_metrics[m.date] = []
-                all_metrics[m.date].append(m)
+            if daily:
+                frames[ticker] = pd.DataFrame(
+                    [[getattr(m, f) for f in COMPONENT_FIELDS] for m in daily],
+                    index=pd.DatetimeIndex([m.date for m in daily]),
+                    columns=COMPONENT_FIELDS,
+                )
+        return frames
+    
+    @staticmethod
+    def _aggregate_frames(frames: list[pd.DataFrame], bundle_name: str) -> list[AggregateMetrics]:
+        """Sum component frames across tickers and derive the weighted ratios per date."""
+        if not frames:
+            return []
+        
+        # Align every ticker to a shared, sorted date axis and sum the
+        # components across tickers in one vectorized reduction
+        all_dates = pd.DatetimeIndex(np.unique(np.concatenate([f.index.values for f in frames])))
+        stacked = np.stack([
+            f.to_numpy() if f.index.equals(all_dates)
+            else f.reindex(all_dates, fill_value=0).to_numpy()
+            for f in frames
+        ])
+        totals = stacked.sum(axis=0)
+        counts = np.stack([all_dates.isin(f.index) for f in frames]).sum(axis=0)
         
         results = []
-        for d in sorted(all_metrics.keys()):
-            day_metrics = all_metrics[d]
-            
-            # Sum up components
-            total_market_cap = sum(m.market_cap for m in day_metrics)
-            total_ev = sum(m.enterprise_value for m in day_metrics)
-            total_net_income = sum(m.net_income_ttm for m in day_metrics)
-            total_revenue = sum(m.revenue_ttm for m in day_metrics)
-            total_ebitda = sum(m.ebitda_ttm for m in day_metrics)
+        for d, row, count in zip(all_dates.date, totals, counts):
+            total_market_cap, total_ev, total_net_income, total_revenue, total_ebitda = map(float, row)
             
             # Calculate aggregate ratios
             agg_pe = total_market_cap / total_net_income if total_net_income > 0 else None
@@ -315,26 +414,83 @@ class TimeSeriesService:
                 aggregate_ps=agg_ps,
                 aggregate_ev_revenue=agg_ev_rev,
                 aggregate_ev_ebitda=agg_ev_ebitda,
-                company_count=len(day_metrics),
+                company_count=int(count),
             ))
         
         return results
     
+    def calculate_bundle_metrics(
+        self,
+        tickers: list[str],
+        bundle_name: str,
+        start_date: date,
+        end_date: date,
+    ) -> list[AggregateMetrics]:
+        """
+        Calculate aggregate metrics for a bundle of companies.
+        
+        Uses proper weighting:
+        - Aggregate P/E = Total Market Cap / Total Net Income
+        - Aggregate EV/Revenue = Total EV / Total Revenue
+        """
+        frames = self._component_frames(tickers, start_date, end_date)
+        return self._aggregate_frames([frames[t] for t in tickers if t in frames], bundle_name)
+    
+    def calculate_bundles_metrics_batch(
+        self,
+        bundles: dict[str, list[str]],  # {bundle_name: [tickers]}
+        start_date: date,
+        end_date: date,
+    ) -> dict[str, list[AggregateMetrics]]:
+        """
+        Calculate aggregate metrics for several bundles at once.
+        
+        Daily metrics are computed once per ticker across the union of all
+        bundles, so tickers shared between bundles are not recomputed.
+        """
+        all_tickers = [t for tickers in bundles.values() for t in tickers]
+        frames = self._component_frames(all_tickers, start_date, end_date)
+        
+        return {
+            bundle_name: self._aggregate_frames(
+                [frames[t] for t in tickers if t in frames], bundle_name
+            )
+            for bundle_name, tickers in bundles.items()
+        }
+    
     def get_companies_by_sector(self, sector: str) -> list[str]:
         """Get tickers for companies in a sector based on SIC code."""
         if sector not in SECTOR_DEFINITIONS:
             return []
         
-        sic_prefixes = SECTOR_DEFINITIONS[sector]
-        
-        companies = self.db.query(Company).filter(Company.sic_code.isnot(None)).all()
+        # Match on the 2-digit SIC prefix in the database instead of scanning
+        # every company in Python
+        rows = (
+            self.db.query(Company.ticker)
+            .filter(
+                Company.sic_code.isnot(None),
+                func.substr(Company.sic_code, 1, 2).in_(SECTOR_DEFINITIONS[sector]),
+            )
+            .order_by(Company.id)
+            .all()
+        )
         
-        tickers = []
-        for company in companies:
-            if company.sic_code and any(company.sic_code.startswith(p) for p in sic_prefixes):
-                tickers.append(company.ticker)
+        return [ticker for (ticker,) in rows]
+    
+    def get_sector_map(self) -> dict[str, list[str]]:
+        """Get tickers for every sector at once, keyed by sector name."""
+        rows = (
+            self.db.query(Company.ticker, Company.sic_code)
+            .filter(Company.sic_code.isnot(None))
+            .order_by(Company.id)
+            .all()
+        )
         
-        return tickers
+        sector_map = defaultdict(list)
+        for ticker, sic_code in rows:
+            for sector in get_sectors_for_sic(sic_code):
+                sector_map[sector].append(ticker)
+        return dict(sector_map)
     
     def get_premade_bundle(self, bundle_name: str) -> list[str]:
         """Get tickers for a pre-made bundle."""
@@ -359,11 +515,18 @@ class TimeSeriesService:
         
         Returns DataFrame with date index and bundle names as columns.
         """
+        bundle_metrics = self.calculate_bundles_metrics_batch(bundles, start_date, end_date)
+        return self.pivot_bundle_metrics(bundle_metrics, metric)
+    
+    @staticmethod
+    def pivot_bundle_metrics(
+        bundle_metrics: dict[str, list[AggregateMetrics]],
+        metric: str = "aggregate_pe",
+    ) -> pd.DataFrame:
+        """Pivot per-bundle metrics to a DataFrame with date index and bundle names as columns."""
         all_data = []
         
-        for bundle_name, tickers in bundles.items():
-            metrics = self.calculate_bundle_metrics(tickers, bundle_name, start_date, end_date)
-            
+        for bundle_name, metrics in bundle_metrics.items():
             for m in metrics:
                 value = getattr(m, metric, None)
                 all_data.append({
@@ -374,7 +537,7 @@ class TimeSeriesService:
                     "company_count": m.company_count,
                 })
         
-        df = pd.DataFrame(all_data)
+        df = _records_to_frame(all_data)
         
         if df.empty:
             return df
@@ -391,6 +554,8 @@ class TimeSeriesService:
         end_date: date,
     ) -> pd.DataFrame:
         """Get daily metrics for multiple tickers as a DataFrame."""
+        self._load_companies(tickers)
+        
         all_data = []
         
         for ticker in tickers:
@@ -410,4 +575,4 @@ class TimeSeriesService:
                     "revenue_ttm": m.revenue_ttm,
                 })
         
-        return pd.DataFrame(all_data)
+        return _records_to_frame(all_data)
@@ -158,6 +158,7 @@ CREATE TABLE IF NOT EXISTS financial_facts (
 CREATE INDEX idx_financial_facts_cik ON financial_facts(cik);
 CREATE INDEX idx_financial_facts_concept ON financial_facts(concept);
 CREATE INDEX idx_financial_facts_company ON financial_facts(company_id);
+CREATE INDEX idx_financial_facts_company_concept_period ON financial_facts(company_id, concept, period_end DESC);
 
 -- ============================================
 -- INDEX CONSTITUENTS (S&P 500, etc.)
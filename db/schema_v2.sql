@@ -11,6 +11,10 @@ ADD COLUMN IF NOT EXISTS frame VARCHAR(20);
 -- Create index on accession_number for joining
 CREATE INDEX IF NOT EXISTS idx_financial_facts_accession ON financial_facts(accession_number);
 
+-- Composite index for latest-N-quarters lookups per company/concept
+CREATE INDEX IF NOT EXISTS idx_financial_facts_company_concept_period
+    ON financial_facts(company_id, concept, period_end DESC);
+
 -- Ingestion tracking table
 CREATE TABLE IF NOT EXISTS ingestion_runs (
     id SERIAL PRIMARY KEY,
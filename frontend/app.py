@@ -4,6 +4,7 @@ Finance App Dashboard - Streamlit Frontend
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -51,6 +52,9 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Upper bound on bars sent to the browser for the price chart
+MAX_CHART_POINTS = 2000
+
 
 def get_db():
     """Get database session."""
@@ -86,6 +90,66 @@ def format_percent(num):
     return f"{num*100:.1f}%"
 
 
+def format_large_number_series(values: pd.Series) -> pd.Series:
+    """Vectorized format_large_number for a whole column (missing values become N/A)."""
+    x = values.astype(float).to_numpy()
+    mag = np.abs(x)
+    bins = [mag >= 1e12, mag >= 1e9, mag >= 1e6, mag >= 1e3]
+    scale = np.select(bins, [1e12, 1e9, 1e6, 1e3], 1.0)
+    suffix = np.select(bins, ["T", "B", "M", "K"], "")
+    # Thousands get one decimal, every other bin two
+    text = np.where(bins[3] & ~bins[2], np.char.mod("%.1f", x / scale), np.char.mod("%.2f", x / scale))
+    formatted = np.char.add(np.char.add("$", text), suffix)
+    return pd.Series(np.where(np.isnan(x), "N/A", formatted), index=values.index)
+
+
+def format_price_series(values: pd.Series) -> pd.Series:
+    """Format a price column as dollars (missing values become N/A)."""
+    x = values.astype(float).to_numpy()
+    formatted = np.char.add("$", np.char.mod("%.2f", x))
+    return pd.Series(np.where(np.isnan(x), "N/A", formatted), index=values.index)
+
+
+def format_ratio_series(values: pd.Series, precision: int = 2, suffix: str = "x") -> pd.Series:
+    """Vectorized format_ratio for a whole column (missing values become N/A)."""
+    x = values.astype(float).to_numpy()
+    formatted = np.char.add(np.char.mod(f"%.{precision}f", x), suffix)
+    return pd.Series(np.where(np.isnan(x), "N/A", formatted), index=values.index)
+
+
+def format_percent_series(values: pd.Series) -> pd.Series:
+    """Vectorized format_percent for a whole column (missing values become N/A)."""
+    x = values.astype(float).to_numpy()
+    formatted = np.char.add(np.char.mod("%.1f", x * 100), "%")
+    return pd.Series(np.where(np.isnan(x), "N/A", formatted), index=values.index)
+
+
+def downsample_ohlc(df: pd.DataFrame, max_points: int = MAX_CHART_POINTS) -> pd.DataFrame:
+    """
+    Reduce a price frame to at most max_points OHLCV bars.
+    
+    Consecutive rows are merged into evenly sized buckets (first open, max
+    high, min low, last close, summed volume) so candles keep their full range.
+    """
+    n = len(df)
+    if n <= max_points:
+        return df
+    
+    buckets = np.arange(n) * max_points // n
+    return (
+        df.groupby(buckets)
+        .agg(
+            date=("date", "first"),
+            open=("open", "first"),
+            high=("high", "max"),
+            low=("low", "min"),
+            close=("close", "last"),
+            volume=("volume", "sum"),
+        )
+        .reset_index(drop=True)
+    )
+
+
 @st.cache_data(ttl=300)
 def load_companies():
     """Load all companies."""
@@ -98,29 +162,26 @@ def load_companies():
 
 
 @st.cache_data(ttl=60)
-def load_stock_prices(ticker: str):
-    """Load stock prices for a ticker."""
+def load_stock_prices(ticker: str, start_date=None, end_date=None):
+    """Load stock prices for a ticker, optionally limited to a date range."""
     db = get_db()
     try:
-        prices = (
-            db.query(StockPrice)
-            .filter(StockPrice.ticker == ticker)
-            .order_by(StockPrice.date)
-            .all()
-        )
-        if not prices:
-            return pd.DataFrame()
+        query = db.query(
+            StockPrice.date,
+            StockPrice.open,
+            StockPrice.high,
+            StockPrice.low,
+            StockPrice.close,
+            StockPrice.volume,
+        ).filter(StockPrice.ticker == ticker)
+        if start_date:
+            query = query.filter(StockPrice.date >= start_date)
+        if end_date:
+            query = query.filter(StockPrice.date <= end_date)
         
-        data = [{
-            "date": p.date,
-            "open": float(p.open) if p.open else None,
-            "high": float(p.high) if p.high else None,
-            "low": float(p.low) if p.low else None,
-            "close": float(p.close) if p.close else None,
-            "volume": p.volume,
-        } for p in prices]
-        
-        return pd.DataFrame(data)
+        # Build the frame column-wise from the cursor; Numeric prices are
+        # coerced to float64
+        return pd.read_sql(query.order_by(StockPrice.date).statement, db.connection())
     finally:
         db.close()
 
@@ -146,53 +207,73 @@ def load_all_metrics():
     """Load metrics for all companies."""
     db = get_db()
     try:
-        # Get latest metric for each ticker
+        # Get latest metric for each ticker in a single pass: rank rows per
+        # ticker by date and keep the first (works on Postgres and SQLite)
         from sqlalchemy import func
         
-        subq = (
+        columns = {
+            "Ticker": ValuationMetric.ticker,
+            "Price": ValuationMetric.price,
+            "Market Cap": ValuationMetric.market_cap,
+            "P/E": ValuationMetric.pe_ratio,
+            "P/S": ValuationMetric.ps_ratio,
+            "P/B": ValuationMetric.pb_ratio,
+            "EV/Revenue": ValuationMetric.ev_revenue,
+            "EV/EBITDA": ValuationMetric.ev_ebitda,
+            "Gross Margin": ValuationMetric.gross_margin,
+            "Operating Margin": ValuationMetric.operating_margin,
+            "Net Margin": ValuationMetric.net_margin,
+            "ROE": ValuationMetric.roe,
+            "ROA": ValuationMetric.roa,
+        }
+        
+        ranked = (
             db.query(
-                ValuationMetric.ticker,
-                func.max(ValuationMetric.date).label("max_date")
+                *columns.values(),
+                func.row_number().over(
+                    partition_by=ValuationMetric.ticker,
+                    order_by=ValuationMetric.date.desc(),
+                ).label("rn"),
             )
-            .group_by(ValuationMetric.ticker)
             .subquery()
         )
         
-        metrics = (
-            db.query(ValuationMetric)
-            .join(
-                subq,
-                (ValuationMetric.ticker == subq.c.ticker) &
-                (ValuationMetric.date == subq.c.max_date)
-            )
+        rows = (
+            db.query(*[ranked.c[col.key] for col in columns.values()])
+            .filter(ranked.c.rn == 1)
+            .order_by(ranked.c.ticker)
+            .all()
+        )
+        df = pd.DataFrame.from_records(rows, columns=list(columns))
+        
+        # One lookup for all company names instead of a query per row
+        names = dict(
+            db.query(Company.ticker, Company.name)
+            .filter(Company.ticker.in_(df["Ticker"].tolist()))
             .all()
         )
+        df.insert(1, "Company", df["Ticker"].map(lambda t: names.get(t, t)))
         
-        data = []
-        for m in metrics:
-            company = db.query(Company).filter(Company.ticker == m.ticker).first()
-            data.append({
-                "Ticker": m.ticker,
-                "Company": company.name if company else m.ticker,
-                "Price": float(m.price) if m.price else None,
-                "Market Cap": m.market_cap,
-                "P/E": float(m.pe_ratio) if m.pe_ratio else None,
-                "P/S": float(m.ps_ratio) if m.ps_ratio else None,
-                "P/B": float(m.pb_ratio) if m.pb_ratio else None,
-                "EV/Revenue": float(m.ev_revenue) if m.ev_revenue else None,
-                "EV/EBITDA": float(m.ev_ebitda) if m.ev_ebitda else None,
-                "Gross Margin": float(m.gross_margin) if m.gross_margin else None,
-                "Operating Margin": float(m.operating_margin) if m.operating_margin else None,
-                "Net Margin": float(m.net_margin) if m.net_margin else None,
-                "ROE": float(m.roe) if m.roe else None,
-                "ROA": float(m.roa) if m.roa else None,
-            })
+        # Numeric columns come back as Decimal
+        float_cols = [c for c in columns if c not in ("Ticker", "Market Cap")]
+        df[float_cols] = df[float_cols].astype(float)
         
-        return pd.DataFrame(data)
+        return df
     finally:
         db.close()
 
 
+@st.cache_data(ttl=60)
+def load_margin_comparison():
+    """Load margins for all companies in long format for the grouped bar chart."""
+    return load_all_metrics().melt(
+        id_vars=["Ticker"],
+        value_vars=["Gross Margin", "Operating Margin", "Net Margin"],
+        var_name="Metric",
+        value_name="Value"
+    )
+
+
 def render_overview():
     """Render market overview page."""
     st.title("📊 Market Overview")
@@ -235,7 +316,7 @@ def render_overview():
             color_continuous_scale="RdYlGn_r",
         )
         fig_pe.update_layout(showlegend=False)
-        st.plotly_chart(fig_pe, use_container_width=True)
+        st.plotly_chart(fig_pe, use_container_width=True, key="overview_pe_chart")
     
     with col2:
         # EV/Revenue comparison
@@ -248,17 +329,12 @@ def render_overview():
             color_continuous_scale="RdYlGn_r",
         )
         fig_ev.update_layout(showlegend=False)
-        st.plotly_chart(fig_ev, use_container_width=True)
+        st.plotly_chart(fig_ev, use_container_width=True, key="overview_ev_chart")
     
     # Profitability comparison
     st.subheader("Profitability Metrics")
     
-    margin_df = df.melt(
-        id_vars=["Ticker"],
-        value_vars=["Gross Margin", "Operating Margin", "Net Margin"],
-        var_name="Metric",
-        value_name="Value"
-    )
+    margin_df = load_margin_comparison()
     
     fig_margins = px.bar(
         margin_df,
@@ -269,23 +345,71 @@ def render_overview():
         title="Margin Comparison",
     )
     fig_margins.update_layout(yaxis_tickformat=".0%")
-    st.plotly_chart(fig_margins, use_container_width=True)
+    st.plotly_chart(fig_margins, use_container_width=True, key="overview_margins_chart")
     
     # Data table
     st.subheader("Detailed Metrics")
     
     # Format the dataframe for display
     display_df = df.copy()
-    display_df["Market Cap"] = display_df["Market Cap"].apply(format_large_number)
-    display_df["Gross Margin"] = display_df["Gross Margin"].apply(format_percent)
-    display_df["Operating Margin"] = display_df["Operating Margin"].apply(format_percent)
-    display_df["Net Margin"] = display_df["Net Margin"].apply(format_percent)
-    display_df["ROE"] = display_df["ROE"].apply(format_percent)
-    display_df["ROA"] = display_df["ROA"].apply(format_percent)
+    display_df["Market Cap"] = format_large_number_series(display_df["Market Cap"])
+    for col in ["Gross Margin", "Operating Margin", "Net Margin", "ROE", "ROA"]:
+        display_df[col] = format_percent_series(display_df[col])
     
     st.dataframe(display_df, use_container_width=True, hide_index=True)
 
 
+def render_price_chart(ticker: str, prices_df: pd.DataFrame):
+    """Render candlestick and volume chart for a price frame."""
+    chart_df = downsample_ohlc(prices_df)
+    
+    # Candlestick chart
+    fig = make_subplots(
+        rows=2, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.03,
+        row_heights=[0.7, 0.3],
+    )
+    
+    # Candlestick
+    fig.add_trace(
+        go.Candlestick(
+            x=chart_df["date"],
+            open=chart_df["open"],
+            high=chart_df["high"],
+            low=chart_df["low"],
+            close=chart_df["close"],
+            name="Price",
+        ),
+        row=1, col=1
+    )
+    
+    # Volume
+    colors = np.where(chart_df["close"].to_numpy() < chart_df["open"].to_numpy(), "red", "green")
+    
+    fig.add_trace(
+        go.Bar(
+            x=chart_df["date"],
+            y=chart_df["volume"],
+            marker_color=colors,
+            name="Volume",
+            opacity=0.5,
+        ),
+        row=2, col=1
+    )
+    
+    fig.update_layout(
+        title=f"{ticker} Stock Price",
+        yaxis_title="Price ($)",
+        yaxis2_title="Volume",
+        xaxis_rangeslider_visible=False,
+        height=600,
+    )
+    
+    st.plotly_chart(fig, use_container_width=True, key=f"price_chart_{ticker}")
+
+
+@st.fragment
 def render_stock_detail(ticker: str):
     """Render stock detail page."""
     db = get_db()
@@ -301,13 +425,8 @@ def render_stock_detail(ticker: str):
     st.title(f"📈 {company.name} ({ticker})")
     
     # Load data
-    prices_df = load_stock_prices(ticker)
     metrics = load_metrics(ticker)
     
-    if prices_df.empty:
-        st.warning("No price data available for this stock.")
-        return
-    
     # Key metrics
     st.subheader("Key Metrics")
     
@@ -347,57 +466,13 @@ def render_stock_detail(ticker: str):
     )
     
     days = range_options[selected_range]
-    if days:
-        cutoff = datetime.now().date() - timedelta(days=days)
-        chart_df = prices_df[prices_df["date"] >= cutoff]
-    else:
-        chart_df = prices_df
-    
-    # Candlestick chart
-    fig = make_subplots(
-        rows=2, cols=1,
-        shared_xaxes=True,
-        vertical_spacing=0.03,
-        row_heights=[0.7, 0.3],
-    )
+    cutoff = datetime.now().date() - timedelta(days=days) if days else None
+    prices_df = load_stock_prices(ticker, start_date=cutoff)
     
-    # Candlestick
-    fig.add_trace(
-        go.Candlestick(
-            x=chart_df["date"],
-            open=chart_df["open"],
-            high=chart_df["high"],
-            low=chart_df["low"],
-            close=chart_df["close"],
-            name="Price",
-        ),
-        row=1, col=1
-    )
-    
-    # Volume
-    colors = ["red" if close < open else "green" 
-              for open, close in zip(chart_df["open"], chart_df["close"])]
-    
-    fig.add_trace(
-        go.Bar(
-            x=chart_df["date"],
-            y=chart_df["volume"],
-            marker_color=colors,
-            name="Volume",
-            opacity=0.5,
-        ),
-        row=2, col=1
-    )
-    
-    fig.update_layout(
-        title=f"{ticker} Stock Price",
-        yaxis_title="Price ($)",
-        yaxis2_title="Volume",
-        xaxis_rangeslider_visible=False,
-        height=600,
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    if prices_df.empty:
+        st.warning("No price data available for this time range.")
+    else:
+        render_price_chart(ticker, prices_df)
     
     # Additional metrics cards
     if metrics:
@@ -423,15 +498,18 @@ def render_stock_detail(ticker: str):
             st.metric("Operating Margin", format_percent(float(metrics.operating_margin) if metrics.operating_margin else None))
             st.metric("Net Margin", format_percent(float(metrics.net_margin) if metrics.net_margin else None))
     
-    # Price data table
-    with st.expander("View Price Data"):
-        st.dataframe(
-            prices_df.sort_values("date", ascending=False).head(30),
-            use_container_width=True,
-            hide_index=True,
-        )
+    # Price data table (prices are loaded date-ascending, so the latest 30
+    # rows are a reversed slice of the tail rather than a full sort)
+    if not prices_df.empty:
+        with st.expander("View Price Data"):
+            st.dataframe(
+                prices_df.tail(30).iloc[::-1],
+                use_container_width=True,
+                hide_index=True,
+            )
 
 
+@st.fragment
 def render_screener():
     """Render stock screener page."""
     st.title("🔍 Stock Screener")
@@ -447,11 +525,13 @@ def render_screener():
     # Filters
     col1, col2, col3 = st.columns(3)
     
+    pe_max = df["P/E"].max()
+    
     with col1:
         pe_range = st.slider(
             "P/E Ratio",
             min_value=0.0,
-            max_value=float(df["P/E"].max()) if df["P/E"].max() else 200.0,
+            max_value=float(pe_max) if pd.notna(pe_max) and pe_max else 200.0,
             value=(0.0, 100.0),
         )
     
@@ -484,13 +564,12 @@ def render_screener():
     
     # Format for display
     display_df = filtered.copy()
-    display_df["Price"] = display_df["Price"].apply(lambda x: f"${x:.2f}" if x else "N/A")
-    display_df["Market Cap"] = display_df["Market Cap"].apply(format_large_number)
-    display_df["P/E"] = display_df["P/E"].apply(lambda x: f"{x:.1f}" if x else "N/A")
-    display_df["EV/Revenue"] = display_df["EV/Revenue"].apply(lambda x: f"{x:.1f}" if x else "N/A")
-    display_df["Gross Margin"] = display_df["Gross Margin"].apply(format_percent)
-    display_df["Net Margin"] = display_df["Net Margin"].apply(format_percent)
-    display_df["ROE"] = display_df["ROE"].apply(format_percent)
+    display_df["Price"] = format_price_series(display_df["Price"])
+    display_df["Market Cap"] = format_large_number_series(display_df["Market Cap"])
+    for col in ["P/E", "EV/Revenue"]:
+        display_df[col] = format_ratio_series(display_df[col], precision=1, suffix="")
+    for col in ["Gross Margin", "Net Margin", "ROE"]:
+        display_df[col] = format_percent_series(display_df[col])
     
     st.dataframe(
         display_df[["Ticker", "Company", "Price", "Market Cap", "P/E", "EV/Revenue", "Net Margin", "ROE"]],
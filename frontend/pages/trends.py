@@ -13,7 +13,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta, date
+from datetime import timedelta, date
 import sys
 from pathlib import Path
 
@@ -35,6 +35,11 @@ def get_db():
     return SessionLocal()
 
 
+def get_today() -> date:
+    """Today's date, fixed for the session so date defaults and cache keys stay stable."""
+    return st.session_state.setdefault("trends_today", date.today())
+
+
 @st.cache_data(ttl=300)
 def load_all_tickers():
     """Load all available tickers."""
@@ -46,6 +51,47 @@ def load_all_tickers():
         db.close()
 
 
+@st.cache_data(ttl=300)
+def load_premade_bundle(bundle: str) -> list[str]:
+    """Load the tickers of a pre-made bundle that exist in the database."""
+    tickers = load_all_tickers()
+    return [t for t in PREMADE_BUNDLES[bundle] if t in tickers]
+
+
+@st.cache_data(ttl=300)
+def load_sector_map() -> dict[str, list[str]]:
+    """Load the tickers of every sector that exist in the database."""
+    tickers = load_all_tickers()
+    db = get_db()
+    try:
+        sector_map = TimeSeriesService(db).get_sector_map()
+    finally:
+        db.close()
+    return {
+        sector: [t for t in sector_tickers if t in tickers]
+        for sector, sector_tickers in sector_map.items()
+    }
+
+
+@st.cache_data(ttl=300)
+def load_bundle_metrics(
+    bundles: tuple[tuple[str, tuple[str, ...]], ...],
+    start_date: date,
+    end_date: date,
+):
+    """Load aggregate metrics for bundles given as frozen (name, tickers) pairs."""
+    db = get_db()
+    try:
+        service = TimeSeriesService(db)
+        return service.calculate_bundles_metrics_batch(
+            {name: list(tickers) for name, tickers in bundles},
+            start_date,
+            end_date,
+        )
+    finally:
+        db.close()
+
+
 def format_large_number(num):
     """Format large numbers with B/M/K suffixes."""
     if num is None:
@@ -72,6 +118,7 @@ METRIC_LABELS = {
 }
 
 
+@st.fragment
 def render_individual_trends():
     """Render individual stock trend analysis."""
     st.subheader("📈 Individual Stock Trends")
@@ -100,16 +147,17 @@ def render_individual_trends():
         )
     
     # Date range
+    today = get_today()
     col1, col2 = st.columns(2)
     with col1:
         start_date = st.date_input(
             "Start Date",
-            value=datetime.now().date() - timedelta(days=30),
+            value=today - timedelta(days=30),
         )
     with col2:
         end_date = st.date_input(
             "End Date",
-            value=datetime.now().date(),
+            value=today,
         )
     
     if not selected:
@@ -129,21 +177,32 @@ def render_individual_trends():
         return
     
     # Plot individual trends
-    fig = px.line(
-        df,
-        x="date",
-        y=metric,
-        color="ticker",
+    fig = go.Figure()
+    
+    for ticker, group in df.groupby("ticker", sort=False):
+        fig.add_trace(go.Scattergl(
+            x=group["date"],
+            y=group[metric],
+            mode="lines",
+            name=ticker,
+        ))
+    
+    fig.update_layout(
         title=f"{METRIC_LABELS.get(metric, metric)} Over Time",
-        labels={metric: METRIC_LABELS.get(metric, metric), "date": "Date"},
+        xaxis_title="Date",
+        yaxis_title=METRIC_LABELS.get(metric, metric),
+        legend_title_text="ticker",
+        height=500,
+        hovermode="x unified",
     )
-    fig.update_layout(height=500, hovermode="x unified")
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, use_container_width=True, key="individual_trends_chart")
     
     # Summary table
     st.subheader("Current Values")
     
-    latest = df.sort_values("date").groupby("ticker").last().reset_index()
+    # Rows arrive date-ordered per ticker, so the last row per ticker is the
+    # latest one; no re-sort or per-column groupby needed
+    latest = df.drop_duplicates("ticker", keep="last").sort_values("ticker").reset_index(drop=True)
     display_cols = ["ticker", "price", "market_cap", metric]
     
     display_df = latest[display_cols].copy()
@@ -154,6 +213,7 @@ def render_individual_trends():
     st.dataframe(display_df, use_container_width=True, hide_index=True)
 
 
+@st.fragment
 def render_bundle_comparison():
     """Render bundle comparison analysis."""
     st.subheader("📊 Bundle Comparison")
@@ -185,7 +245,7 @@ def render_bundle_comparison():
         )
         
         for bundle in selected_premade:
-            bundle_tickers = [t for t in PREMADE_BUNDLES[bundle] if t in tickers]
+            bundle_tickers = load_premade_bundle(bundle)
             if bundle_tickers:
                 selected_bundles[bundle] = bundle_tickers
                 st.caption(f"**{bundle}**: {', '.join(bundle_tickers)}")
@@ -199,17 +259,12 @@ def render_bundle_comparison():
             help="Select industry sectors",
         )
         
-        db = get_db()
-        try:
-            service = TimeSeriesService(db)
-            for sector in selected_sectors:
-                sector_tickers = service.get_companies_by_sector(sector)
-                sector_tickers = [t for t in sector_tickers if t in tickers]
-                if sector_tickers:
-                    selected_bundles[f"Sector: {sector}"] = sector_tickers
-                    st.caption(f"**{sector}**: {', '.join(sector_tickers[:5])}{'...' if len(sector_tickers) > 5 else ''}")
-        finally:
-            db.close()
+        sector_map = load_sector_map()
+        for sector in selected_sectors:
+            sector_tickers = sector_map.get(sector, [])
+            if sector_tickers:
+                selected_bundles[f"Sector: {sector}"] = sector_tickers
+                st.caption(f"**{sector}**: {', '.join(sector_tickers[:5])}{'...' if len(sector_tickers) > 5 else ''}")
     
     with tab3:
         st.markdown("Create custom bundles by selecting securities:")
@@ -237,6 +292,7 @@ def render_bundle_comparison():
         return
     
     # Metric and date range
+    today = get_today()
     col1, col2, col3 = st.columns(3)
     
     with col1:
@@ -250,33 +306,30 @@ def render_bundle_comparison():
     with col2:
         start_date = st.date_input(
             "Start Date",
-            value=datetime.now().date() - timedelta(days=30),
+            value=today - timedelta(days=30),
             key="bundle_start",
         )
     
     with col3:
         end_date = st.date_input(
             "End Date",
-            value=datetime.now().date(),
+            value=today,
             key="bundle_end",
         )
     
     # Calculate and display
     st.markdown("### Trend Comparison")
     
-    db = get_db()
-    try:
-        service = TimeSeriesService(db)
-        
-        # Get comparison data
-        comparison_df = service.compare_bundles(
-            selected_bundles,
-            start_date,
-            end_date,
-            metric,
-        )
-    finally:
-        db.close()
+    # Compute every bundle in one pass; the chart and summary share it, and
+    # the result is cached on the frozen bundle contents and date range so
+    # switching metrics does not recompute
+    bundle_metrics = load_bundle_metrics(
+        tuple((name, tuple(tickers)) for name, tickers in selected_bundles.items()),
+        start_date,
+        end_date,
+    )
+    
+    comparison_df = TimeSeriesService.pivot_bundle_metrics(bundle_metrics, metric)
     
     if comparison_df.empty:
         st.warning("No data available for the selected bundles and date range.")
@@ -288,7 +341,7 @@ def render_bundle_comparison():
     colors = px.colors.qualitative.Set2
     
     for i, bundle in enumerate(comparison_df.columns):
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=comparison_df.index,
             y=comparison_df[bundle],
             mode="lines",
@@ -311,43 +364,33 @@ def render_bundle_comparison():
         ),
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, use_container_width=True, key="bundle_comparison_chart")
     
     # Summary statistics
     st.markdown("### Bundle Statistics")
     
     summary_data = []
     
-    db = get_db()
-    try:
-        service = TimeSeriesService(db)
-        
-        for bundle_name, bundle_tickers in selected_bundles.items():
-            metrics = service.calculate_bundle_metrics(
-                bundle_tickers, bundle_name, start_date, end_date
-            )
+    for bundle_name, metrics in bundle_metrics.items():
+        if metrics:
+            latest = metrics[-1]
+            first = metrics[0]
             
-            if metrics:
-                latest = metrics[-1]
-                first = metrics[0]
-                
-                current_val = getattr(latest, metric)
-                start_val = getattr(first, metric)
-                
-                change = None
-                if current_val and start_val:
-                    change = ((current_val - start_val) / start_val) * 100
-                
-                summary_data.append({
-                    "Bundle": bundle_name,
-                    "Companies": latest.company_count,
-                    "Total Market Cap": format_large_number(latest.total_market_cap),
-                    "Total EV": format_large_number(latest.total_enterprise_value),
-                    f"Current {METRIC_LABELS.get(metric, metric)}": f"{current_val:.2f}x" if current_val else "N/A",
-                    "Change": f"{change:+.1f}%" if change else "N/A",
-                })
-    finally:
-        db.close()
+            current_val = getattr(latest, metric)
+            start_val = getattr(first, metric)
+            
+            change = None
+            if current_val and start_val:
+                change = ((current_val - start_val) / start_val) * 100
+            
+            summary_data.append({
+                "Bundle": bundle_name,
+                "Companies": latest.company_count,
+                "Total Market Cap": format_large_number(latest.total_market_cap),
+                "Total EV": format_large_number(latest.total_enterprise_value),
+                f"Current {METRIC_LABELS.get(metric, metric)}": f"{current_val:.2f}x" if current_val else "N/A",
+                "Change": f"{change:+.1f}%" if change else "N/A",
+            })
     
     if summary_data:
         st.dataframe(
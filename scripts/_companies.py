@@ -0,0 +1,39 @@
+"""Company universe helpers shared by the company-list ingestion scripts."""
+
+import orjson
+
+from _http import cached_get
+
+SEC_TICKERS = "https://www.sec.gov/files/company_tickers.json"
+
+# Concurrent Yahoo Finance requests when fetching market caps
+MARKET_CAP_WORKERS = 16
+
+
+def get_sec_ticker_mapping(user_agent: str) -> dict[str, dict]:
+    """Get SEC ticker -> {cik, name} mapping (CIKs padded to 10 digits)."""
+    headers = {
+        "User-Agent": user_agent,
+        "Accept": "application/json",
+    }
+    data = orjson.loads(cached_get(SEC_TICKERS, headers))
+
+    return {
+        entry["ticker"]: {
+            "cik": str(entry.get("cik_str", "")).zfill(10),
+            "name": entry.get("title", ""),
+        }
+        for entry in data.values()
+        if entry.get("ticker")
+    }
+
+
+def fetch_market_cap(ticker: str):
+    """Get the market cap for one ticker from Yahoo Finance (None if unavailable)."""
+    import yfinance as yf
+
+    try:
+        mc = yf.Ticker(ticker).info.get("marketCap")
+    except Exception:
+        return None
+    return mc if mc and mc > 0 else None
@@ -0,0 +1,69 @@
+"""HTTP helpers shared by the ingestion scripts."""
+
+import hashlib
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared HTTP session so Wikipedia, SEC and Yahoo fetches reuse pooled
+# connections and retry transient 5xx failures. 429s are left to callers:
+# an adapter retry would skip their rate limiting. The last response is
+# handed back rather than raised, for the caller's raise_for_status.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=2.0,
+        status_forcelist=[500, 502, 503, 504],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    ),
+))
+
+# Downloads are cached on disk for a day
+HTTP_CACHE_DIR = Path(__file__).parent.parent / "data" / "http_cache"
+HTTP_CACHE_TTL = 24 * 60 * 60
+
+
+def cached_get(url: str, headers: Optional[dict] = None,
+               fetch: Optional[Callable[[], bytes]] = None) -> bytes:
+    """GET a URL, reusing a copy cached on disk for HTTP_CACHE_TTL seconds.
+    
+    By default the download goes through SESSION; callers with their own
+    session, rate limiting or retry rules pass `fetch` to do it instead.
+    """
+    cache_file = HTTP_CACHE_DIR / hashlib.sha256(url.encode()).hexdigest()
+    if cache_file.exists():
+        if time.time() - cache_file.stat().st_mtime < HTTP_CACHE_TTL:
+            return cache_file.read_bytes()
+        cache_file.unlink(missing_ok=True)
+    
+    if fetch is None:
+        response = SESSION.get(url, headers=headers)
+        response.raise_for_status()
+        content = response.content
+    else:
+        content = fetch()
+    HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cache_file.write_bytes(content)
+    return content
+
+
+def prune_http_cache():
+    """Delete cached downloads older than HTTP_CACHE_TTL.
+    
+    URLs whose query changes from run to run (e.g. a date range ending today)
+    never hit their old entries again, so those are only cleared by a sweep.
+    """
+    if not HTTP_CACHE_DIR.exists():
+        return
+    cutoff = time.time() - HTTP_CACHE_TTL
+    for cache_file in HTTP_CACHE_DIR.iterdir():
+        if cache_file.stat().st_mtime < cutoff:
+            cache_file.unlink(missing_ok=True)
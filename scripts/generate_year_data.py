@@ -1,21 +1,30 @@
 #!/usr/bin/env python3
 """Generate a year of realistic price data for demo companies."""
 
+import csv
 import sys
+from io import StringIO
 from pathlib import Path
-from datetime import date, timedelta
-from decimal import Decimal
-import random
-import math
+from datetime import date
+
+import numpy as np
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from backend.database import engine, Base, SessionLocal
+from sqlalchemy import insert, select
+
+from backend.database import engine, Base
 from backend.models.company import Company
 from backend.models.prices import StockPrice
 from backend.models.filings import FinancialFact
 from backend.models.metrics import ValuationMetric
 
+# Fixed seed so every run generates the same demo prices
+RANDOM_SEED = 42
+
+# Column order for the COPY path
+PRICE_COLUMNS = ["company_id", "ticker", "date", "open", "high", "low", "close", "adj_close", "volume"]
+
 # Starting prices (1 year ago) and current targets
 STOCK_CONFIG = {
     "AAPL": {"start": 185.0, "end": 246.30, "volatility": 0.015, "volume_base": 45000000},
@@ -25,19 +34,17 @@ STOCK_CONFIG = {
 }
 
 
-def generate_price_path(start_price, end_price, days, volatility):
+def generate_price_path(start_price, end_price, days, volatility, rng=None):
     """Generate realistic price path using geometric Brownian motion with drift."""
-    prices = [start_price]
+    rng = rng or np.random.default_rng()
     
     # Calculate drift needed to hit target
     total_return = end_price / start_price
-    daily_drift = (math.log(total_return)) / days
+    daily_drift = np.log(total_return) / days
     
-    for i in range(1, days):
-        # Random walk with drift
-        daily_return = daily_drift + volatility * random.gauss(0, 1)
-        new_price = prices[-1] * math.exp(daily_return)
-        prices.append(new_price)
+    # Random walk with drift: cumulative log returns from the start price
+    daily_returns = daily_drift + volatility * rng.standard_normal(days - 1)
+    prices = start_price * np.exp(np.concatenate([[0.0], np.cumsum(daily_returns)]))
     
     # Ensure we hit the target on the last day (with small adjustment)
     prices[-1] = end_price
@@ -45,29 +52,49 @@ def generate_price_path(start_price, end_price, days, volatility):
     return prices
 
 
-def generate_ohlc(close_price, volatility):
-    """Generate realistic OHLC from close price."""
-    daily_range = close_price * volatility * random.uniform(0.5, 1.5)
+def generate_ohlc(closes, volatility, rng=None):
+    """Generate realistic open/high/low arrays from an array of close prices."""
+    rng = rng or np.random.default_rng()
+    n = len(closes)
     
-    high = close_price + daily_range * random.uniform(0.3, 0.7)
-    low = close_price - daily_range * random.uniform(0.3, 0.7)
+    daily_range = closes * volatility * rng.uniform(0.5, 1.5, n)
+    
+    high = closes + daily_range * rng.uniform(0.3, 0.7, n)
+    low = closes - daily_range * rng.uniform(0.3, 0.7, n)
     
     # Open somewhere between low and high
-    open_price = low + (high - low) * random.uniform(0.2, 0.8)
+    opens = low + (high - low) * rng.uniform(0.2, 0.8, n)
+    
+    # Ensure OHLC consistency
+    high = np.maximum.reduce([high, opens, closes])
+    low = np.minimum.reduce([low, opens, closes])
+    
+    return opens, high, low
+
+
+def insert_prices(conn, rows):
+    """Insert price rows with COPY on PostgreSQL, or one executemany INSERT elsewhere."""
+    if conn.dialect.name != "postgresql":
+        conn.execute(insert(StockPrice.__table__), rows)
+        return
+    
+    buf = StringIO()
+    csv.writer(buf).writerows([row[col] for col in PRICE_COLUMNS] for row in rows)
+    buf.seek(0)
     
-    return open_price, high, low
+    # Raw psycopg2 cursor on the same connection, so the COPY commits
+    # with the rest of the transaction
+    cursor = conn.connection.cursor()
+    cursor.copy_expert(
+        f"COPY stock_prices ({', '.join(PRICE_COLUMNS)}) FROM STDIN WITH CSV",
+        buf,
+    )
 
 
 def get_trading_days(start_date, end_date):
     """Get list of trading days (skip weekends)."""
-    days = []
-    current = start_date
-    while current <= end_date:
-        # Skip weekends (5 = Saturday, 6 = Sunday)
-        if current.weekday() < 5:
-            days.append(current)
-        current += timedelta(days=1)
-    return days
+    days = np.arange(np.datetime64(start_date), np.datetime64(end_date) + 1)
+    return days[np.is_busday(days)].tolist()
 
 
 def main():
@@ -83,66 +110,62 @@ def main():
     
     print(f"Trading days: {num_days}")
     
-    db = SessionLocal()
-    
-    try:
-        # Clear existing prices
-        db.query(StockPrice).delete()
-        db.commit()
+    # Clear and reload prices in one transaction; engine.begin() rolls
+    # back on any error
+    with engine.begin() as conn:
+        conn.execute(StockPrice.__table__.delete())
         
+        rng = np.random.default_rng(RANDOM_SEED)
+        rows = []
         for ticker, config in STOCK_CONFIG.items():
             print(f"Generating prices for {ticker}...")
             
             # Get company
-            company = db.query(Company).filter(Company.ticker == ticker).first()
-            if not company:
+            company_id = conn.execute(
+                select(Company.id).where(Company.ticker == ticker).limit(1)
+            ).scalar()
+            if company_id is None:
                 print(f"  Company {ticker} not found, skipping")
                 continue
             
-            # Generate price path
+            # Generate price path and OHLC/volume for every day at once
             closes = generate_price_path(
                 config["start"],
                 config["end"],
                 num_days,
-                config["volatility"]
+                config["volatility"],
+                rng,
+            )
+            opens, highs, lows = generate_ohlc(closes, config["volatility"], rng)
+            volumes = (config["volume_base"] * rng.uniform(0.6, 1.4, num_days)).astype(np.int64).tolist()
+            
+            # Rounded Python floats; the Numeric columns take them as-is
+            opens, highs, lows, closes = (
+                np.round(arr, 2).tolist() for arr in (opens, highs, lows, closes)
             )
             
             # Create price records
             for i, day in enumerate(trading_days):
-                close = closes[i]
-                open_price, high, low = generate_ohlc(close, config["volatility"])
-                
-                # Ensure OHLC consistency
-                high = max(high, open_price, close)
-                low = min(low, open_price, close)
-                
-                # Volume with some randomness
-                volume = int(config["volume_base"] * random.uniform(0.6, 1.4))
-                
-                db.add(StockPrice(
-                    company_id=company.id,
-                    ticker=ticker,
-                    date=day,
-                    open=Decimal(str(round(open_price, 2))),
-                    high=Decimal(str(round(high, 2))),
-                    low=Decimal(str(round(low, 2))),
-                    close=Decimal(str(round(close, 2))),
-                    adj_close=Decimal(str(round(close, 2))),
-                    volume=volume,
-                ))
+                rows.append({
+                    "company_id": company_id,
+                    "ticker": ticker,
+                    "date": day,
+                    "open": opens[i],
+                    "high": highs[i],
+                    "low": lows[i],
+                    "close": closes[i],
+                    "adj_close": closes[i],
+                    "volume": volumes[i],
+                })
             
-            print(f"  Added {num_days} price records for {ticker}")
-        
-        db.commit()
-        print("\nDone! Year of price data generated.")
+            print(f"  Generated {num_days} price records for {ticker}")
         
-    except Exception as e:
-        db.rollback()
-        print(f"Error: {e}")
-        raise
-    finally:
-        db.close()
-
+        # One bulk write for every ticker instead of per-row ORM adds
+        if rows:
+            insert_prices(conn, rows)
+    
+    print(f"Inserted {len(rows)} price records")
+    print("\nDone! Year of price data generated.")
 
 if __name__ == "__main__":
     main()
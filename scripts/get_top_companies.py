@@ -5,25 +5,26 @@ Uses known indices (S&P 500, etc.) + screens for large caps.
 """
 
 import sys
-import json
-import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from io import StringIO
 
 # Unbuffered output
 sys.stdout.reconfigure(line_buffering=True)
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import yfinance as yf
+import lxml.html
+import orjson
 import pandas as pd
-import requests
+
+from _companies import MARKET_CAP_WORKERS, fetch_market_cap, get_sec_ticker_mapping
+from _http import cached_get
 
 # Sources for large companies
 SP500_WIKI = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
 SP400_WIKI = "https://en.wikipedia.org/wiki/List_of_S%26P_400_companies"
 NASDAQ100_WIKI = "https://en.wikipedia.org/wiki/Nasdaq-100"
-SEC_TICKERS = "https://www.sec.gov/files/company_tickers.json"
+SEC_USER_AGENT = "OpenClaw Finance App contact@openclaw.io"
 
 
 def fetch_wiki_html(url):
@@ -31,9 +32,32 @@ def fetch_wiki_html(url):
     headers = {
         "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
     }
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    return response.text
+    return cached_get(url, headers).decode("utf-8")
+
+
+def get_table_column(html: str, headers: list[str]) -> list[str]:
+    """
+    Get the cell text of a column from the first table that has one of headers.
+    
+    Walks the parsed HTML with XPath instead of building a DataFrame for
+    every table on the page.
+    """
+    tree = lxml.html.fromstring(html)
+    for table in tree.xpath("//table"):
+        rows = table.xpath("./thead/tr|./tbody/tr|./tr")
+        if not rows:
+            continue
+        header_cells = [" ".join(c.text_content().split()) for c in rows[0].xpath("./th|./td")]
+        for header in headers:
+            if header in header_cells:
+                idx = header_cells.index(header)
+                values = []
+                for row in rows[1:]:
+                    cells = row.xpath("./th|./td")
+                    if len(cells) > idx:
+                        values.append(cells[idx].text_content().strip())
+                return values
+    return []
 
 
 def get_sp500_tickers():
@@ -42,10 +66,7 @@ def get_sp500_tickers():
         print("  Fetching S&P 500 HTML...")
         html = fetch_wiki_html(SP500_WIKI)
         print(f"  Got {len(html)} bytes, parsing...")
-        tables = pd.read_html(StringIO(html))
-        df = tables[0]
-        tickers = df["Symbol"].str.replace(".", "-").tolist()
-        return tickers
+        return [t.replace(".", "-") for t in get_table_column(html, ["Symbol"])]
     except Exception as e:
         print(f"Error fetching S&P 500: {e}")
         return []
@@ -57,11 +78,7 @@ def get_sp400_tickers():
         print("  Fetching S&P 400 HTML...")
         html = fetch_wiki_html(SP400_WIKI)
         print(f"  Got {len(html)} bytes, parsing...")
-        tables = pd.read_html(StringIO(html))
-        df = tables[0]
-        col = "Ticker symbol" if "Ticker symbol" in df.columns else df.columns[1]
-        tickers = df[col].str.replace(".", "-").tolist()
-        return tickers
+        return [t.replace(".", "-") for t in get_table_column(html, ["Ticker symbol", "Symbol"])]
     except Exception as e:
         print(f"Error fetching S&P 400: {e}")
         return []
@@ -73,52 +90,20 @@ def get_nasdaq100_tickers():
         print("  Fetching NASDAQ 100 HTML...")
         html = fetch_wiki_html(NASDAQ100_WIKI)
         print(f"  Got {len(html)} bytes, parsing...")
-        tables = pd.read_html(StringIO(html))
-        for table in tables:
-            if "Ticker" in table.columns:
-                return table["Ticker"].tolist()
-            if "Symbol" in table.columns:
-                return table["Symbol"].tolist()
-        return []
+        return get_table_column(html, ["Ticker", "Symbol"])
     except Exception as e:
         print(f"Error fetching NASDAQ 100: {e}")
         return []
 
 
-def get_sec_ticker_to_cik():
-    """Get SEC ticker to CIK mapping."""
-    headers = {
-        "User-Agent": "OpenClaw Finance App contact@openclaw.io",
-        "Accept": "application/json",
-    }
-    response = requests.get(SEC_TICKERS, headers=headers)
-    response.raise_for_status()
-    data = response.json()
-    
-    mapping = {}
-    for entry in data.values():
-        ticker = entry.get("ticker", "")
-        cik = str(entry.get("cik_str", "")).zfill(10)
-        name = entry.get("title", "")
-        if ticker:
-            mapping[ticker] = {"cik": cik, "name": name}
-    
-    return mapping
-
-
 def get_market_caps_batch(tickers: list[str]) -> dict[str, float]:
-    """Get market caps for a list of tickers."""
+    """Get market caps for a list of tickers, fetching concurrently."""
     market_caps = {}
     
-    for ticker in tickers:
-        try:
-            info = yf.Ticker(ticker).info
-            mc = info.get("marketCap", 0)
-            if mc and mc > 0:
+    with ThreadPoolExecutor(max_workers=MARKET_CAP_WORKERS) as executor:
+        for ticker, mc in zip(tickers, executor.map(fetch_market_cap, tickers)):
+            if mc:
                 market_caps[ticker] = mc
-        except:
-            pass
-        time.sleep(0.2)  # Rate limit
     
     return market_caps
 
@@ -140,15 +125,15 @@ def main():
     print(f"  NASDAQ 100: {len(nasdaq100)} tickers")
     
     # Combine and dedupe
-    all_tickers = list(set(sp500 + sp400 + nasdaq100))
+    all_tickers = set(sp500 + sp400 + nasdaq100)
     print(f"  Combined unique: {len(all_tickers)} tickers")
     
     # Get SEC CIK mapping
     print("Fetching SEC CIK mappings...")
-    sec_mapping = get_sec_ticker_to_cik()
+    sec_mapping = get_sec_ticker_mapping(SEC_USER_AGENT)
     
     # Filter to those with SEC filings
-    tickers_with_cik = [t for t in all_tickers if t in sec_mapping]
+    tickers_with_cik = list(all_tickers & sec_mapping.keys())
     print(f"  With SEC filings: {len(tickers_with_cik)} tickers")
     
     # Get market caps
@@ -177,12 +162,12 @@ def main():
     companies.sort(key=lambda x: x["market_cap"], reverse=True)
     
     # Save
-    with open(output_file, "w") as f:
-        json.dump({
+    with open(output_file, "wb") as f:
+        f.write(orjson.dumps({
             "generated_at": pd.Timestamp.now().isoformat(),
             "count": len(companies),
             "companies": companies,
-        }, f, indent=2)
+        }, option=orjson.OPT_INDENT_2))
     
     print(f"\nSaved {len(companies)} companies to {output_file}")
     print("\nTop 10 by market cap:")
@@ -21,16 +21,18 @@ Progress is saved and can be resumed.
 import sys
 import argparse
 import logging
-import json
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from io import StringIO
 
 # Add project to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import orjson
 import pandas as pd
-import requests
 
 from backend.services.edgar_ingestion import (
     EdgarIngestionService,
@@ -40,6 +42,15 @@ from backend.services.edgar_ingestion import (
 from backend.database import engine
 from sqlalchemy import text
 
+from _companies import MARKET_CAP_WORKERS, fetch_market_cap, get_sec_ticker_mapping
+from _http import HTTP_CACHE_TTL, cached_get
+
+SEC_USER_AGENT = "FinanceApp admin@openclaw.ai"
+
+# Fetched market caps, one [ticker, market_cap, fetched_at] JSON line per fetch;
+# each entry is reused by re-runs until it is HTTP_CACHE_TTL old
+MARKET_CAP_CACHE = Path(__file__).parent.parent / "data" / "marketcap_cache.jsonl"
+
 
 # Configure logging
 def setup_logging(verbose: bool = False):
@@ -68,29 +79,28 @@ def fetch_html(url: str) -> str:
     headers = {
         "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
     }
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    return response.text
+    return cached_get(url, headers).decode("utf-8")
 
 
 def get_sp500_companies() -> list[dict]:
     """Fetch S&P 500 companies from Wikipedia."""
     url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
     html = fetch_html(url)
-    tables = pd.read_html(html)
-    df = tables[0]
-    
-    companies = []
-    for _, row in df.iterrows():
-        ticker = str(row.get("Symbol", "")).replace(".", "-")
-        companies.append({
-            "ticker": ticker,
-            "name": row.get("Security", ""),
-            "sector": row.get("GICS Sector", ""),
-            "industry": row.get("GICS Sub-Industry", ""),
-        })
-    
-    return companies
+    # Parse only the constituents table, with the lxml parser
+    df = pd.read_html(StringIO(html), match="Symbol", flavor="lxml")[0]
+    
+    blank = pd.Series("", index=df.index)
+    tickers = df.get("Symbol", blank).astype(str).str.replace(".", "-", regex=False)
+    
+    return [
+        {"ticker": ticker, "name": name, "sector": sector, "industry": industry}
+        for ticker, name, sector, industry in zip(
+            tickers,
+            df.get("Security", blank),
+            df.get("GICS Sector", blank),
+            df.get("GICS Sub-Industry", blank),
+        )
+    ]
 
 
 def get_sp400_companies() -> list[dict]:
@@ -98,70 +108,80 @@ def get_sp400_companies() -> list[dict]:
     url = "https://en.wikipedia.org/wiki/List_of_S%26P_400_companies"
     try:
         html = fetch_html(url)
-        tables = pd.read_html(html)
-        df = tables[0]
+        df = pd.read_html(StringIO(html), match="Ticker symbol|Symbol", flavor="lxml")[0]
         
         ticker_col = "Ticker symbol" if "Ticker symbol" in df.columns else "Symbol"
         name_col = "Company" if "Company" in df.columns else "Security"
         
-        companies = []
-        for _, row in df.iterrows():
-            ticker = str(row.get(ticker_col, "")).replace(".", "-")
-            companies.append({
-                "ticker": ticker,
-                "name": row.get(name_col, ""),
-            })
+        blank = pd.Series("", index=df.index)
+        tickers = df.get(ticker_col, blank).astype(str).str.replace(".", "-", regex=False)
         
-        return companies
+        return [
+            {"ticker": ticker, "name": name}
+            for ticker, name in zip(tickers, df.get(name_col, blank))
+        ]
     except Exception as e:
         logging.warning(f"Could not fetch S&P 400: {e}")
         return []
 
 
-def get_sec_cik_mapping() -> dict[str, str]:
-    """Get ticker to CIK mapping from SEC."""
-    url = "https://www.sec.gov/files/company_tickers.json"
-    headers = {
-        "User-Agent": "FinanceApp admin@openclaw.ai",
-        "Accept": "application/json",
-    }
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    data = response.json()
-    
-    mapping = {}
-    for entry in data.values():
-        ticker = entry.get("ticker", "")
-        cik = str(entry.get("cik_str", "")).zfill(10)
-        name = entry.get("title", "")
-        if ticker:
-            mapping[ticker] = {"cik": cik, "name": name}
-    
-    return mapping
+def load_market_cap_cache() -> dict[str, float]:
+    """Load market caps saved by earlier runs, dropping entries older than HTTP_CACHE_TTL.
+    
+    The file is rewritten without the expired entries, so it stays bounded.
+    """
+    if not MARKET_CAP_CACHE.exists():
+        return {}
+    now = time.time()
+    entries = {}
+    lines = MARKET_CAP_CACHE.read_bytes().splitlines()
+    for line in lines:
+        try:
+            ticker, mc, fetched_at = orjson.loads(line)
+        except (orjson.JSONDecodeError, ValueError):
+            continue  # e.g. a line cut short by an interrupted run
+        if now - fetched_at < HTTP_CACHE_TTL:
+            entries[ticker] = (mc, fetched_at)
+    
+    if len(entries) < len(lines):
+        tmp_file = MARKET_CAP_CACHE.with_suffix(".tmp")
+        tmp_file.write_bytes(b"".join(
+            orjson.dumps([t, mc, at]) + b"\n" for t, (mc, at) in entries.items()
+        ))
+        os.replace(tmp_file, MARKET_CAP_CACHE)
+    return {t: mc for t, (mc, _) in entries.items()}
+
+
+def save_market_cap_cache(market_caps: dict[str, float]):
+    """Append newly fetched market caps so an interrupted run can resume."""
+    MARKET_CAP_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    fetched_at = time.time()
+    with open(MARKET_CAP_CACHE, "ab") as f:
+        f.write(b"".join(
+            orjson.dumps([t, mc, fetched_at]) + b"\n" for t, mc in market_caps.items()
+        ))
 
 
 def get_market_caps(tickers: list[str], logger) -> dict[str, float]:
-    """Get market caps using Yahoo Finance."""
-    import yfinance as yf
+    """Get market caps using Yahoo Finance, fetching concurrently."""
+    cache = load_market_cap_cache()
+    market_caps = {t: cache[t] for t in tickers if t in cache}
+    pending = [t for t in tickers if t not in cache]
+    if market_caps:
+        logger.info(f"Reusing {len(market_caps)} cached market caps")
     
-    market_caps = {}
     batch_size = 20
-    
-    for i in range(0, len(tickers), batch_size):
-        batch = tickers[i:i + batch_size]
-        logger.info(f"Fetching market caps: {i + len(batch)}/{len(tickers)}")
-        
-        for ticker in batch:
-            try:
-                info = yf.Ticker(ticker).info
-                mc = info.get("marketCap")
-                if mc and mc > 0:
-                    market_caps[ticker] = mc
-            except Exception:
-                pass
-            time.sleep(0.1)
-        
-        time.sleep(0.5)  # Rate limit
+    batch = {}
+    
+    with ThreadPoolExecutor(max_workers=MARKET_CAP_WORKERS) as executor:
+        for i, (ticker, mc) in enumerate(zip(pending, executor.map(fetch_market_cap, pending)), 1):
+            if mc:
+                market_caps[ticker] = mc
+                batch[ticker] = mc
+            if i % batch_size == 0 or i == len(pending):
+                save_market_cap_cache(batch)
+                batch = {}
+                logger.info(f"Fetching market caps: {i}/{len(pending)}")
     
     return market_caps
 
@@ -193,7 +213,7 @@ def build_company_list(logger, limit: int = None) -> list[CompanyInfo]:
     
     # Get SEC CIK mapping
     logger.info("Fetching SEC CIK mappings...")
-    sec_mapping = get_sec_cik_mapping()
+    sec_mapping = get_sec_ticker_mapping(SEC_USER_AGENT)
     
     # Filter to companies with SEC filings
     tickers_with_cik = [t for t in all_companies.keys() if t in sec_mapping]
@@ -230,8 +250,8 @@ def build_company_list(logger, limit: int = None) -> list[CompanyInfo]:
     output_file = Path(__file__).parent.parent / "data" / "company_list.json"
     output_file.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_file, "w") as f:
-        json.dump({
+    with open(output_file, "wb") as f:
+        f.write(orjson.dumps({
             "generated_at": datetime.now().isoformat(),
             "count": len(companies),
             "companies": [
@@ -243,7 +263,7 @@ def build_company_list(logger, limit: int = None) -> list[CompanyInfo]:
                 }
                 for c in companies
             ]
-        }, f, indent=2)
+        }, option=orjson.OPT_INDENT_2))
     
     logger.info(f"Saved company list to {output_file}")
     
@@ -266,18 +286,27 @@ def apply_schema_updates(logger):
         with open(schema_file) as f:
             sql = f.read()
         
-        with engine.connect() as conn:
-            # Execute each statement separately
-            for statement in sql.split(";"):
-                statement = statement.strip()
-                if statement:
-                    try:
-                        conn.execute(text(statement))
-                    except Exception as e:
-                        # Ignore "already exists" errors
-                        if "already exists" not in str(e).lower():
-                            logger.warning(f"Schema update warning: {e}")
-            conn.commit()
+        try:
+            # The schema is idempotent (IF NOT EXISTS throughout), so send it
+            # as one batch in one transaction
+            with engine.begin() as conn:
+                conn.exec_driver_sql(sql)
+        except Exception as e:
+            # Drivers that reject multi-statement batches (SQLite) or
+            # statements the backend can't run: fall back to one at a time
+            logger.debug(f"Batched schema update failed, applying per statement: {getattr(e, 'orig', e)}")
+            with engine.connect() as conn:
+                # Execute each statement separately
+                for statement in sql.split(";"):
+                    statement = statement.strip()
+                    if statement:
+                        try:
+                            conn.execute(text(statement))
+                        except Exception as e:
+                            # Ignore "already exists" errors
+                            if "already exists" not in str(e).lower():
+                                logger.warning(f"Schema update warning: {e}")
+                conn.commit()
         
         logger.info("Schema updates applied")
 
@@ -328,12 +357,12 @@ def run_ingestion(companies: list[CompanyInfo], logger, min_year: int = 1990):
     
     # Save summary
     summary_file = Path(__file__).parent.parent / "data" / "ingestion_summary.json"
-    with open(summary_file, "w") as f:
-        json.dump({
+    with open(summary_file, "wb") as f:
+        f.write(orjson.dumps({
             "completed_at": datetime.now().isoformat(),
             "elapsed_seconds": elapsed,
             "summary": {k: v for k, v in summary.items() if k != "results"},
-        }, f, indent=2)
+        }, option=orjson.OPT_INDENT_2))
     
     return summary
 
@@ -2,8 +2,12 @@
 """Sample data ingestion script - fetch data for a few stocks to test."""
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import requests
+from requests.adapters import HTTPAdapter
+
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -15,58 +19,80 @@ from backend.services.metrics import MetricsService
 
 SAMPLE_TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA"]
 
+# Tickers are independent, so each one runs on its own thread. SEC calls from
+# all threads share EdgarService's process-wide rate limiter.
+SAMPLE_WORKERS = len(SAMPLE_TICKERS)
 
-def main():
-    """Ingest sample data."""
+# One keep-alive pool for every worker's SEC requests, so TLS setup to
+# sec.gov/data.sec.gov happens once per connection rather than per call
+SEC_SESSION = requests.Session()
+SEC_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
+
+def process_ticker(ticker: str) -> list[str]:
+    """Ingest one ticker in its own DB session, returning its progress lines.
+    
+    Lines are collected rather than printed so output from parallel tickers
+    doesn't interleave.
+    """
+    lines = [f"\n{'='*50}", f"Processing {ticker}", '='*50]
+    log = lines.append
+    
+    # SQLAlchemy sessions aren't thread-safe; one per worker
     db = SessionLocal()
     
     try:
         price_service = PriceService(db)
-        edgar_service = EdgarService(db)
+        edgar_service = EdgarService(db, session=SEC_SESSION)
         metrics_service = MetricsService(db)
         
-        for ticker in SAMPLE_TICKERS:
-            print(f"\n{'='*50}")
-            print(f"Processing {ticker}")
-            print('='*50)
-            
-            # Fetch prices
-            print(f"Fetching prices for {ticker}...")
-            result = price_service.fetch_prices(ticker)
-            print(f"  Prices: {result['prices']}, Splits: {result['splits']}, Dividends: {result['dividends']}")
-            
-            # Sync company from SEC
-            print(f"Syncing SEC info for {ticker}...")
-            company = edgar_service.sync_company_info(ticker)
-            if company:
-                print(f"  CIK: {company.cik}, Name: {company.name}")
-            
-            # Fetch SEC filings
-            print(f"Fetching SEC filings for {ticker}...")
-            filings_count = edgar_service.fetch_filings(ticker)
-            print(f"  Filings synced: {filings_count}")
-            
-            # Fetch XBRL facts
-            print(f"Fetching financial facts for {ticker}...")
-            facts_count = edgar_service.fetch_company_facts(ticker)
-            print(f"  Facts synced: {facts_count}")
-            
-            # Calculate metrics
-            print(f"Calculating metrics for {ticker}...")
-            metrics = metrics_service.calculate_metrics(ticker)
-            if "error" not in metrics:
-                print(f"  Market Cap: ${metrics.get('market_cap', 0):,.0f}")
-                print(f"  P/E Ratio: {metrics.get('pe_ratio', 'N/A')}")
-                print(f"  EV/Revenue: {metrics.get('ev_revenue', 'N/A')}")
-            else:
-                print(f"  Error: {metrics['error']}")
-            
-            print()
+        # Fetch prices
+        log(f"Fetching prices for {ticker}...")
+        result = price_service.fetch_prices(ticker)
+        log(f"  Prices: {result['prices']}, Splits: {result['splits']}, Dividends: {result['dividends']}")
+        
+        # Sync company from SEC
+        log(f"Syncing SEC info for {ticker}...")
+        company = edgar_service.sync_company_info(ticker)
+        if company:
+            log(f"  CIK: {company.cik}, Name: {company.name}")
+        
+        # Fetch SEC filings
+        log(f"Fetching SEC filings for {ticker}...")
+        filings_count = edgar_service.fetch_filings(ticker)
+        log(f"  Filings synced: {filings_count}")
         
-        print("Sample ingestion complete!")
+        # Fetch XBRL facts
+        log(f"Fetching financial facts for {ticker}...")
+        facts_count = edgar_service.fetch_company_facts(ticker)
+        log(f"  Facts synced: {facts_count}")
+        
+        # Calculate metrics
+        log(f"Calculating metrics for {ticker}...")
+        metrics = metrics_service.calculate_metrics(ticker)
+        if "error" not in metrics:
+            log(f"  Market Cap: ${metrics.get('market_cap', 0):,.0f}")
+            log(f"  P/E Ratio: {metrics.get('pe_ratio', 'N/A')}")
+            log(f"  EV/Revenue: {metrics.get('ev_revenue', 'N/A')}")
+        else:
+            log(f"  Error: {metrics['error']}")
+        
+        log("")
         
     finally:
         db.close()
+    
+    return lines
+
+
+def main():
+    """Ingest sample data."""
+    with ThreadPoolExecutor(max_workers=SAMPLE_WORKERS) as pool:
+        # map() yields in SAMPLE_TICKERS order, so the report reads as before
+        for lines in pool.map(process_ticker, SAMPLE_TICKERS):
+            print("\n".join(lines))
+    
+    print("Sample ingestion complete!")
 
 
 if __name__ == "__main__":
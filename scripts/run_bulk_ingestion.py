@@ -19,17 +19,21 @@ Example:
     python scripts/run_bulk_ingestion.py --resume
 
 Progress is saved to data/ingestion_progress.json and can be resumed.
+The full log is written to data/ingestion.log (rotated at 50 MB); the console
+only shows warnings unless --verbose is given.
 """
 
 import sys
 import argparse
 import logging
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
 # Add project to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from backend.services.edgar_bulk import EdgarBulkService
+from backend.database import SessionLocal, create_db_engine, db_url
+from backend.services.edgar_bulk import DEFAULT_BATCH_SIZE, EdgarBulkService
 
 
 def main():
@@ -37,20 +41,27 @@ def main():
     parser.add_argument("--limit", type=int, default=2500, help="Number of companies to process")
     parser.add_argument("--min-year", type=int, default=1990, help="Earliest year to fetch")
     parser.add_argument("--resume", action="store_true", help="Resume from previous progress")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Facts per insert batch")
     parser.add_argument("--user-agent", type=str, default="FinanceApp jp@example.com",
                         help="User agent for SEC API (include your email)")
     parser.add_argument("--verbose", action="store_true", help="Verbose logging")
     
     args = parser.parse_args()
     
-    # Configure logging
+    # Configure logging: the full log goes to a size-capped rotating file;
+    # the console only shows warnings unless --verbose
     log_level = logging.DEBUG if args.verbose else logging.INFO
+    console = logging.StreamHandler()
+    console.setLevel(log_level if args.verbose else logging.WARNING)
     logging.basicConfig(
         level=log_level,
         format="%(asctime)s - %(levelname)s - %(message)s",
         handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler("data/ingestion.log"),
+            console,
+            RotatingFileHandler(
+                "data/ingestion.log", maxBytes=50_000_000, backupCount=5, delay=True
+            ),
         ]
     )
     
@@ -62,8 +73,12 @@ def main():
     logger.info(f"Target companies: {args.limit}")
     logger.info(f"Min year: {args.min_year}")
     logger.info(f"Resume: {args.resume}")
+    logger.info(f"Batch size: {args.batch_size}")
     logger.info("=" * 60)
     
+    # Single writer: a small pool is plenty for the whole run
+    SessionLocal.configure(bind=create_db_engine(db_url, pool_size=2, max_overflow=4))
+    
     # Run ingestion
     service = EdgarBulkService(user_agent=args.user_agent)
     
@@ -72,6 +87,7 @@ def main():
             limit=args.limit,
             min_year=args.min_year,
             resume=args.resume,
+            batch_size=args.batch_size,
         )
         
         logger.info("=" * 60)
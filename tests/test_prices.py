@@ -1,9 +1,18 @@
 """Tests for price service."""
 
-import pytest
-from datetime import date, timedelta
+import csv
+import logging
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from io import BytesIO, StringIO
+from pathlib import Path
 from unittest.mock import Mock, patch
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow.csv as pa_csv
+import pytest
 
 
 def test_price_service_import():
@@ -14,43 +23,232 @@ def test_price_service_import():
 
 def test_returns_calculation():
     """Test return calculation logic."""
-    # Simple return calculation
-    start_price = 100.0
-    end_price = 150.0
+    # Simple return calculation; append cases to the arrays
+    start_price = np.array([100.0, 100.0, 50.0])
+    end_price = np.array([150.0, 110.0, 40.0])
     
     price_return = (end_price - start_price) / start_price
     
-    assert price_return == 0.5  # 50% return
-    assert f"{price_return * 100:.2f}%" == "50.00%"
+    assert np.allclose(price_return, [0.5, 0.10, -0.20])
+    assert f"{price_return[0] * 100:.2f}%" == "50.00%"  # 50% return
 
 
 def test_split_adjustment():
     """Test split adjustment factor calculation."""
     # 4:1 split means old shares become 4 new shares
     # Price should be divided by 4
-    pre_split_price = 400.0
-    split_ratio = 4.0
+    pre_split_price = np.array([400.0, 300.0, 90.0])
+    split_ratio = np.array([4.0, 2.0, 1.5])
     
     post_split_price = pre_split_price / split_ratio
     
-    assert post_split_price == 100.0
+    assert np.allclose(post_split_price, [100.0, 150.0, 60.0])
 
 
 def test_dividend_reinvestment():
     """Test dividend reinvestment impact on total return."""
-    # Simple example: 
+    # Simple example (first case):
     # Start: $100, End: $110 (10% price return)
     # Dividend: $2 (2% yield)
     # Total return should be ~12%
     
-    start_price = 100.0
-    end_price = 110.0
-    dividend = 2.0
+    start_price = np.array([100.0, 100.0, 50.0])
+    end_price = np.array([110.0, 150.0, 40.0])
+    dividend = np.array([2.0, 0.0, 1.0])
     
     price_return = (end_price - start_price) / start_price
     total_return = (end_price + dividend - start_price) / start_price
     dividend_contribution = total_return - price_return
     
-    assert price_return == pytest.approx(0.10)
-    assert total_return == pytest.approx(0.12)
-    assert dividend_contribution == pytest.approx(0.02)
+    assert np.allclose(price_return, [0.10, 0.5, -0.20])
+    assert np.allclose(total_return, [0.12, 0.5, -0.18])
+    assert np.allclose(dividend_contribution, dividend / start_price)
+
+
+# The ingestion scripts import their helpers (_http, _companies) from scripts/
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+CHART_PAYLOAD = {"chart": {"result": [{
+    "meta": {"gmtoffset": -14400},
+    "timestamp": [1717162200, 1717421400, 1717507800],
+    "indicators": {
+        "quote": [{
+            "open": [190.5, None, 194.2],
+            "high": [192.0, 195.1, None],
+            "low": [189.1, 193.0, 193.8],
+            "close": [191.3, 194.0, 194.9],
+            "volume": [1000, None, 3000],
+        }],
+        "adjclose": [{"adjclose": [190.9, 193.6, None]}],
+    },
+    "events": {
+        "splits": {"1717421400": {"date": 1717421400, "numerator": 4, "denominator": 1}},
+        "dividends": {"1717507800": {"date": 1717507800, "amount": 0.25}},
+    },
+}]}}
+
+
+def _exchange_date(timestamp, offset=-14400):
+    return datetime.fromtimestamp(timestamp + offset, tz=timezone.utc).date()
+
+
+def _row_by_row_prices(company_id, ticker, payload):
+    """The original per-row price records: floats, ints, or None for missing values."""
+    result = payload["chart"]["result"][0]
+    quote = result["indicators"]["quote"][0]
+    adj = result["indicators"]["adjclose"][0]["adjclose"]
+    
+    def as_float(v):
+        return float(v) if pd.notna(v) else None
+    
+    return [
+        {
+            "company_id": company_id,
+            "ticker": ticker,
+            "date": _exchange_date(ts),
+            "open": as_float(quote["open"][i]),
+            "high": as_float(quote["high"][i]),
+            "low": as_float(quote["low"][i]),
+            "close": as_float(quote["close"][i]),
+            "adj_close": as_float(adj[i]),
+            "volume": int(quote["volume"][i]) if pd.notna(quote["volume"][i]) else None,
+        }
+        for i, ts in enumerate(result["timestamp"])
+    ]
+
+
+def test_build_price_rows_matches_row_by_row():
+    """Column-wise packing yields the same records as the per-row loop."""
+    from ingest_prices import build_price_rows
+    
+    prices, splits, dividends = build_price_rows({"id": 7, "ticker": "AAPL"}, CHART_PAYLOAD)
+    
+    assert prices.to_pylist() == _row_by_row_prices(7, "AAPL", CHART_PAYLOAD)
+    assert splits == [(7, "AAPL", _exchange_date(1717421400), 4.0)]
+    assert dividends == [(7, "AAPL", _exchange_date(1717507800), 0.25, "cash")]
+
+
+def test_build_price_rows_without_data():
+    """An empty chart result packs to an empty table and no events."""
+    from ingest_prices import PRICE_SCHEMA, build_price_rows
+    
+    prices, splits, dividends = build_price_rows({"id": 1, "ticker": "X"}, {"chart": {"result": None}})
+    
+    assert prices.schema == PRICE_SCHEMA
+    assert len(prices) == 0
+    assert splits == [] and dividends == []
+
+
+def test_pack_prices_nulls_become_empty_csv_fields():
+    """None and NaN are both written as empty CSV fields, which COPY loads as NULL."""
+    from ingest_prices import pack_prices
+    
+    dates = np.array(["2024-06-03", "2024-06-04"], dtype="datetime64[D]")
+    table = pack_prices(
+        3, "MSFT", dates,
+        [1.5, None], [np.nan, 2.5], [1.0, 2.0], [1.25, 2.25], [None, np.nan], [100, None],
+    )
+    
+    buf = BytesIO()
+    pa_csv.write_csv(table, buf, write_options=pa_csv.WriteOptions(include_header=False))
+    rows = list(csv.reader(StringIO(buf.getvalue().decode())))
+    
+    assert rows == [
+        ["3", "MSFT", "2024-06-03", "1.5", "", "1", "1.25", "", "100"],
+        ["3", "MSFT", "2024-06-04", "", "2.5", "2", "2.25", "", ""],
+    ]
+
+
+@pytest.fixture(scope="module")
+def app():
+    """The dashboard module; importing it outside `streamlit run` only defines its helpers."""
+    import frontend.app
+    return frontend.app
+
+
+def test_vectorized_formatters_match_scalar(app):
+    """Column formatters agree with the per-value formatters, with N/A for missing values."""
+    values = pd.Series([3.2e12, -4.5e9, 7.25e6, 1500.0, 12.345, 0.0, None], dtype=float)
+    present = values.notna()
+    
+    large = app.format_large_number_series(values)
+    ratios = app.format_ratio_series(values)
+    percents = app.format_percent_series(values / 1e12)
+    prices = app.format_price_series(values)
+    
+    assert list(large[present]) == [app.format_large_number(v) for v in values[present]]
+    assert list(ratios[present]) == [app.format_ratio(v) for v in values[present]]
+    assert list(percents[present]) == [app.format_percent(v) for v in values[present] / 1e12]
+    assert list(prices[present]) == [f"${v:.2f}" for v in values[present]]
+    for formatted in (large, ratios, percents, prices):
+        assert formatted.iloc[-1] == "N/A"
+        assert formatted.index.equals(values.index)
+
+
+def _row_by_row_downsample(df, max_points):
+    """Merge consecutive rows into max_points evenly sized buckets one bucket at a time."""
+    n = len(df)
+    bars = []
+    for b in range(max_points):
+        rows = df.iloc[[i for i in range(n) if i * max_points // n == b]]
+        bars.append({
+            "date": rows["date"].iloc[0],
+            "open": rows["open"].iloc[0],
+            "high": rows["high"].max(),
+            "low": rows["low"].min(),
+            "close": rows["close"].iloc[-1],
+            "volume": rows["volume"].sum(),
+        })
+    return pd.DataFrame(bars)
+
+
+def test_downsample_ohlc_matches_row_by_row(app):
+    """Bucketed bars keep each bucket's first open, extreme high/low, last close and total volume."""
+    rng = np.random.default_rng(0)
+    n = 103
+    close = 100 + rng.standard_normal(n).cumsum()
+    df = pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n),
+        "open": close + rng.standard_normal(n),
+        "high": close + 2,
+        "low": close - 2,
+        "close": close,
+        "volume": rng.integers(1_000, 5_000, n),
+    })
+    
+    actual = app.downsample_ohlc(df, max_points=10)
+    
+    pd.testing.assert_frame_equal(actual, _row_by_row_downsample(df, 10))
+    assert app.downsample_ohlc(df, max_points=n) is df
+
+
+def test_market_cap_cache_expires_entries_individually(tmp_path, monkeypatch):
+    """Expired or unreadable cache lines are dropped; fresh ones are reused and new fetches appended."""
+    import ingest_edgar
+    
+    cache_file = tmp_path / "marketcap_cache.jsonl"
+    monkeypatch.setattr(ingest_edgar, "MARKET_CAP_CACHE", cache_file)
+    now = time.time()
+    expired = now - ingest_edgar.HTTP_CACHE_TTL - 1
+    cache_file.write_bytes(
+        orjson.dumps(["AAA", 1e9, now]) + b"\n"
+        + orjson.dumps(["OLD", 2e9, expired]) + b"\n"
+        + b'["CUT", 3e9'
+    )
+    
+    fetched = []
+    
+    def fake_fetch(ticker):
+        fetched.append(ticker)
+        return {"OLD": 2.5e9, "NEW": 4e9}.get(ticker)
+    
+    monkeypatch.setattr(ingest_edgar, "fetch_market_cap", fake_fetch)
+    
+    caps = ingest_edgar.get_market_caps(["AAA", "OLD", "NEW", "NONE"], logging.getLogger(__name__))
+    
+    assert caps == {"AAA": 1e9, "OLD": 2.5e9, "NEW": 4e9}
+    assert sorted(fetched) == ["NEW", "NONE", "OLD"]
+    # The stale and truncated lines were compacted away before the append
+    lines = [orjson.loads(line) for line in cache_file.read_bytes().splitlines()]
+    assert [line[:2] for line in lines] == [["AAA", 1e9], ["OLD", 2.5e9], ["NEW", 4e9]]
+    assert ingest_edgar.load_market_cap_cache() == caps
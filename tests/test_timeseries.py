@@ -0,0 +1,219 @@
+"""Tests for time series service helpers."""
+
+from dataclasses import asdict
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import Base
+from backend.models import Company, StockPrice, FinancialFact
+from backend.services.timeseries import (
+    SECTOR_DEFINITIONS,
+    AggregateMetrics,
+    TimeSeriesService,
+    get_sectors_for_sic,
+)
+
+START = date(2026, 1, 5)
+END = date(2026, 1, 16)
+
+
+def test_sectors_for_sic_matches_prefix_scan():
+    """Reverse prefix index agrees with a linear scan of SECTOR_DEFINITIONS."""
+    for sic_code in ["3571", "3674", "3711", "7841", "6021", "4911", "9999"]:
+        expected = [
+            sector for sector, prefixes in SECTOR_DEFINITIONS.items()
+            if any(sic_code.startswith(p) for p in prefixes)
+        ]
+        assert get_sectors_for_sic(sic_code) == expected
+
+
+def test_sectors_for_missing_sic():
+    """Missing SIC codes belong to no sector."""
+    assert get_sectors_for_sic(None) == []
+    assert get_sectors_for_sic("") == []
+
+
+def _fact(company, concept, value, period_end, fiscal_period):
+    return FinancialFact(
+        company_id=company.id, cik=company.cik, taxonomy="us-gaap", concept=concept,
+        value=value, period_end=period_end, fiscal_period=fiscal_period,
+    )
+
+
+@pytest.fixture
+def db():
+    """In-memory database with three companies, two weeks of prices and quarterly facts."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    
+    aaa = Company(id=1, cik="0000000001", name="AAA Corp", ticker="AAA")
+    bbb = Company(id=2, cik="0000000002", name="BBB Corp", ticker="BBB")
+    ccc = Company(id=3, cik="0000000003", name="CCC Corp", ticker="CCC")
+    session.add_all([aaa, bbb, ccc])
+    
+    # AAA trades every weekday, BBB skips some days, CCC has no shares
+    # outstanding and so never produces metrics
+    days = [START + timedelta(days=i) for i in range((END - START).days + 1)]
+    weekdays = [d for d in days if d.weekday() < 5]
+    for i, d in enumerate(weekdays):
+        session.add(StockPrice(company_id=1, ticker="AAA", date=d, close=100 + i, adj_close=99 + i))
+        if i % 3:
+            session.add(StockPrice(company_id=2, ticker="BBB", date=d, close=50 - i, adj_close=None))
+        session.add(StockPrice(company_id=3, ticker="CCC", date=d, close=10, adj_close=10))
+    
+    quarters = [date(2024, 12, 31), date(2025, 3, 31), date(2025, 6, 30), date(2025, 9, 30), date(2025, 12, 31)]
+    for n, period_end in enumerate(quarters):
+        fp = f"Q{period_end.month // 3}"
+        session.add(_fact(aaa, "Revenues", 1000 + 100 * n, period_end, fp))
+        session.add(_fact(aaa, "NetIncomeLoss", 200 + 10 * n, period_end, fp))
+        session.add(_fact(aaa, "OperatingIncomeLoss", 300, period_end, fp))
+    # A filing after END must not count, nor the annual FY figure
+    session.add(_fact(aaa, "Revenues", 99999, date(2026, 3, 31), "Q1"))
+    session.add(_fact(aaa, "Revenues", 50000, date(2025, 12, 31), "FY"))
+    session.add(_fact(aaa, "CommonStockSharesOutstanding", 10, date(2025, 12, 31), "Q4"))
+    session.add(_fact(aaa, "LongTermDebt", 500, date(2025, 12, 31), "Q4"))
+    session.add(_fact(aaa, "CashAndCashEquivalentsAtCarryingValue", 120, date(2025, 12, 31), "Q4"))
+    
+    # BBB has only two quarters (annualized) and a loss, with a missing value
+    session.add(_fact(bbb, "Revenues", 400, date(2025, 9, 30), "Q3"))
+    session.add(_fact(bbb, "Revenues", 600, date(2025, 12, 31), "Q4"))
+    session.add(_fact(bbb, "NetIncomeLoss", -50, date(2025, 12, 31), "Q4"))
+    session.add(_fact(bbb, "NetIncomeLoss", None, date(2025, 9, 30), "Q3"))
+    session.add(_fact(bbb, "EBITDA", 80, date(2025, 12, 31), "Q4"))
+    session.add(_fact(bbb, "CommonStockSharesOutstanding", 20, date(2025, 12, 31), "Q4"))
+    session.commit()
+    
+    yield session
+    session.close()
+
+
+def _row_by_row_ttm(db, company_id, concept, as_of):
+    """The original per-concept TTM lookup: latest 4 quarters, annualized if fewer."""
+    facts = (
+        db.query(FinancialFact)
+        .filter(
+            FinancialFact.company_id == company_id,
+            FinancialFact.concept == concept,
+            FinancialFact.fiscal_period.in_(["Q1", "Q2", "Q3", "Q4"]),
+            FinancialFact.period_end <= as_of,
+        )
+        .order_by(FinancialFact.period_end.desc())
+        .limit(4)
+        .all()
+    )
+    if len(facts) >= 4:
+        return sum(float(f.value) for f in facts if f.value)
+    if facts:
+        return sum(float(f.value) for f in facts if f.value) / len(facts) * 4
+    return None
+
+
+def _row_by_row_bundle(service, tickers, bundle_name):
+    """The original per-date loop that summed DailyMetrics into AggregateMetrics."""
+    all_metrics = {}
+    for ticker in tickers:
+        for m in service.calculate_daily_metrics(ticker, START, END):
+            all_metrics.setdefault(m.date, []).append(m)
+    
+    results = []
+    for d in sorted(all_metrics):
+        day = all_metrics[d]
+        market_cap = sum(m.market_cap for m in day)
+        ev = sum(m.enterprise_value for m in day)
+        net_income = sum(m.net_income_ttm for m in day)
+        revenue = sum(m.revenue_ttm for m in day)
+        ebitda = sum(m.ebitda_ttm for m in day)
+        results.append(AggregateMetrics(
+            date=d,
+            bundle_name=bundle_name,
+            total_market_cap=market_cap,
+            total_enterprise_value=ev,
+            total_net_income=net_income,
+            total_revenue=revenue,
+            total_ebitda=ebitda,
+            aggregate_pe=market_cap / net_income if net_income > 0 else None,
+            aggregate_ps=market_cap / revenue if revenue > 0 else None,
+            aggregate_ev_revenue=ev / revenue if revenue > 0 else None,
+            aggregate_ev_ebitda=ev / ebitda if ebitda > 0 else None,
+            company_count=len(day),
+        ))
+    return results
+
+
+def _assert_metrics_match(actual, expected):
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        assert asdict(a) == pytest.approx(asdict(e))
+
+
+def test_ttm_financials_match_row_by_row(db):
+    """The windowed SUM agrees with summing the latest 4 quarters per concept."""
+    service = TimeSeriesService(db)
+    concepts = ["Revenues", "NetIncomeLoss", "OperatingIncomeLoss", "EBITDA"]
+    
+    ttm = service.get_ttm_financials([1, 2, 3], concepts, END)
+    
+    for company_id in (1, 2, 3):
+        for concept in concepts:
+            expected = _row_by_row_ttm(db, company_id, concept, END)
+            assert ttm.get((company_id, concept)) == pytest.approx(expected)
+    # Spot-check the fixture: quarters 2-5 for AAA, two annualized for BBB
+    assert ttm[(1, "Revenues")] == 1100 + 1200 + 1300 + 1400
+    assert ttm[(2, "Revenues")] == 2000
+    assert (3, "Revenues") not in ttm
+
+
+def test_bundle_metrics_match_row_by_row(db):
+    """Vectorized aggregation matches the per-date loop, including dates some tickers miss."""
+    service = TimeSeriesService(db)
+    tickers = ["AAA", "BBB", "CCC", "MISSING"]
+    
+    actual = service.calculate_bundle_metrics(tickers, "Mix", START, END)
+    
+    expected = _row_by_row_bundle(TimeSeriesService(db), tickers, "Mix")
+    _assert_metrics_match(actual, expected)
+    assert {m.company_count for m in actual} == {1, 2}
+
+
+def test_bundles_batch_matches_single_bundles(db):
+    """The batched call returns the same metrics as computing each bundle on its own."""
+    service = TimeSeriesService(db)
+    bundles = {"Both": ["AAA", "BBB"], "Solo": ["BBB"], "Empty": ["CCC"]}
+    
+    batch = service.calculate_bundles_metrics_batch(bundles, START, END)
+    
+    assert batch.keys() == bundles.keys()
+    for name, tickers in bundles.items():
+        _assert_metrics_match(batch[name], _row_by_row_bundle(TimeSeriesService(db), tickers, name))
+    assert batch["Empty"] == []
+
+
+def test_pivot_bundle_metrics_matches_row_by_row(db):
+    """The pivot has one column per bundle and the original pivot's values."""
+    service = TimeSeriesService(db)
+    bundles = {"Both": ["AAA", "BBB"], "Solo": ["BBB"]}
+    bundle_metrics = service.calculate_bundles_metrics_batch(bundles, START, END)
+    
+    for metric in ("aggregate_pe", "aggregate_ev_revenue", "total_market_cap"):
+        actual = TimeSeriesService.pivot_bundle_metrics(bundle_metrics, metric)
+        
+        expected = pd.DataFrame([
+            {"date": m.date, "bundle": name, "value": getattr(m, metric)}
+            for name, metrics in bundle_metrics.items()
+            for m in metrics
+        ]).pivot(index="date", columns="bundle", values="value")
+        
+        assert list(actual.columns) == list(expected.columns)
+        assert list(actual.index) == list(expected.index)
+        np.testing.assert_allclose(actual.astype(float).to_numpy(), expected.astype(float).to_numpy())
+
+
+def test_pivot_bundle_metrics_empty():
+    """No metrics pivot to an empty frame."""
+    assert TimeSeriesService.pivot_bundle_metrics({"Empty": []}).empty